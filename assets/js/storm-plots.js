@@ -0,0 +1,101 @@
+/* Storm page chart loader: points a group's chart iframes at their pages
+ * only once the group is opened, replaces poster facades with the chart when
+ * a reader asks for it, and registers the chart cache.
+ */
+(function () {
+  'use strict';
+
+  const FRAME_HEIGHT = 520;
+  // The chart cache lives next to the chart pages so its scope covers them.
+  const SERVICE_WORKER_PATH = '../plots/sw.js';
+  const loaderSrc = document.currentScript ? document.currentScript.src : null;
+
+  const registerChartCache = () => {
+    if (!loaderSrc || !('serviceWorker' in navigator)) {
+      return;
+    }
+    const workerUrl = new URL(SERVICE_WORKER_PATH, loaderSrc);
+    navigator.serviceWorker
+      .register(workerUrl.href, { scope: new URL('./', workerUrl).href })
+      .catch(() => {});
+  };
+
+  const loadChart = (facade) => {
+    const src = facade.getAttribute('data-storm-plot-src');
+    if (!src) {
+      return;
+    }
+    const frame = document.createElement('iframe');
+    frame.src = src;
+    frame.width = '100%';
+    frame.height = String(FRAME_HEIGHT);
+    frame.style.border = '0';
+    frame.title = facade.getAttribute('data-storm-plot-title') || '';
+    facade.replaceWith(frame);
+  };
+
+  const warmed = new Set();
+  // Fetches the shared chart scripts into the HTTP cache ahead of the
+  // chart document that needs them.
+  const warmSharedScripts = (group) => {
+    const block = group.closest('[data-storm-plot-preload]');
+    if (!block) {
+      return;
+    }
+    block
+      .getAttribute('data-storm-plot-preload')
+      .split(/\s+/)
+      .filter((url) => url && !warmed.has(url))
+      .forEach((url) => {
+        warmed.add(url);
+        const link = document.createElement('link');
+        link.rel = 'prefetch';
+        link.as = 'script';
+        link.href = url;
+        document.head.appendChild(link);
+      });
+  };
+
+  const hydrateGroup = (group) => {
+    const frames = group.querySelectorAll('iframe[data-storm-plot-src]');
+    if (!frames.length && !group.querySelector('.storm-plot-facade')) {
+      return;
+    }
+    warmSharedScripts(group);
+    frames.forEach((frame) => {
+      frame.src = frame.getAttribute('data-storm-plot-src');
+      frame.removeAttribute('data-storm-plot-src');
+    });
+  };
+
+  // toggle does not bubble, so listen in the capture phase.
+  document.addEventListener(
+    'toggle',
+    (event) => {
+      const group = event.target;
+      if (group.tagName === 'DETAILS' && group.open) {
+        hydrateGroup(group);
+      }
+    },
+    true
+  );
+  document.querySelectorAll('details[open]').forEach(hydrateGroup);
+
+  document.addEventListener('click', (event) => {
+    if (event.defaultPrevented || event.button !== 0 || event.metaKey || event.ctrlKey || event.shiftKey) {
+      return;
+    }
+    const facade = event.target.closest && event.target.closest('.storm-plot-facade');
+    if (!facade) {
+      return;
+    }
+    event.preventDefault();
+    loadChart(facade);
+  });
+
+  if (document.readyState === 'complete') {
+    registerChartCache();
+  } else {
+    window.addEventListener('load', registerChartCache);
+  }
+})();
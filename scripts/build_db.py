@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Record what each pipeline stage read and wrote so unchanged stages are skipped."""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+DB_VERSION = 2
+GENERATOR_PATTERNS = ("*.py", "*.js")
+
+StageRecord = Dict[str, Dict[str, str]]
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def generator_version(scripts_dir: Path) -> str:
+    """Hash of the pipeline's own code; any edit to it invalidates every stage."""
+    digest = hashlib.sha256(str(DB_VERSION).encode("ascii"))
+    paths = sorted(path for pattern in GENERATOR_PATTERNS for path in scripts_dir.glob(pattern))
+    for path in paths:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class StageLog:
+    """One storm's stage records, carried to a build worker and back."""
+
+    root: Path
+    generator: str
+    previous: Dict[str, StageRecord] = field(default_factory=dict)
+    current: Dict[str, StageRecord] = field(default_factory=dict)
+    force: bool = False
+
+    def key(self, path: Path) -> str:
+        return path.resolve().relative_to(self.root.resolve()).as_posix()
+
+    def inputs(self, *paths: Path, **options: object) -> Dict[str, str]:
+        """Describe a stage's inputs: file hashes, options and the generator."""
+        described = {self.key(path): file_hash(path) for path in paths if path.is_file()}
+        if options:
+            described["options"] = json.dumps(options, sort_keys=True)
+        described["generator"] = self.generator
+        return described
+
+    def fresh(self, stage: str, inputs: Dict[str, str]) -> bool:
+        """True when ``stage`` last ran on ``inputs`` and its outputs are untouched."""
+        record = self.previous.get(stage)
+        if self.force or record is None or record["inputs"] != inputs:
+            return False
+        for key, digest in record["outputs"].items():
+            path = self.root / key
+            if not path.is_file() or file_hash(path) != digest:
+                return False
+        self.current[stage] = record
+        return True
+
+    def record(
+        self,
+        stage: str,
+        inputs: Dict[str, str],
+        outputs: Iterable[Path],
+        *,
+        parts: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Store a stage run; ``parts`` maps a part's input hash to its output."""
+        self.current[stage] = {
+            "inputs": inputs,
+            "outputs": {self.key(path): file_hash(path) for path in outputs},
+        }
+        if parts is not None:
+            self.current[stage]["parts"] = parts
+
+    def keep(self, stage: str) -> None:
+        """Carry the last record of a stage that is not run this time."""
+        if stage in self.previous:
+            self.current[stage] = self.previous[stage]
+
+    def reusable_part(self, stage: str, digest: str) -> Optional[str]:
+        """Output key of a part last built from ``digest``, if still intact.
+
+        An empty string stands for a part that writes nothing.
+        """
+        record = self.previous.get(stage)
+        if self.force or record is None:
+            return None
+        key = record.get("parts", {}).get(digest)
+        if not key:
+            return key
+        path = self.root / key
+        if not path.is_file() or record["outputs"].get(key) != file_hash(path):
+            return None
+        return key
+
+    def outputs(self, stage: str) -> Dict[str, str]:
+        return self.current[stage]["outputs"]
+
+    def digest(self, stage: str) -> str:
+        """One hash standing for everything ``stage`` wrote; empty if it never ran."""
+        if stage not in self.current:
+            return ""
+        text = json.dumps(self.outputs(stage), sort_keys=True)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class BuildDatabase:
+    """Stage records of every storm, stored as JSON under build/."""
+
+    path: Path
+    root: Path
+    generator: str
+    storms: Dict[str, Dict[str, StageRecord]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, root: Path, scripts_dir: Path) -> "BuildDatabase":
+        storms: Dict[str, Dict[str, StageRecord]] = {}
+        if path.exists():
+            stored = json.loads(path.read_text(encoding="utf-8"))
+            if stored.get("version") == DB_VERSION:
+                storms = stored.get("storms", {})
+        return cls(path=path, root=root, generator=generator_version(scripts_dir), storms=storms)
+
+    def storm(self, slug: str, *, force: bool = False) -> StageLog:
+        return StageLog(
+            root=self.root,
+            generator=self.generator,
+            previous=dict(self.storms.get(slug, {})),
+            force=force,
+        )
+
+    def update(self, slug: str, stages: StageLog) -> None:
+        self.storms.setdefault(slug, {}).update(stages.current)
+
+    def save(self) -> None:
+        payload = {"version": DB_VERSION, "generator": self.generator, "storms": self.storms}
+        text = json.dumps(payload, indent=2, sort_keys=True) + "\n"
+        if not self.path.exists() or self.path.read_text(encoding="utf-8") != text:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(text, encoding="utf-8")
+
+
+__all__ = [
+    "BuildDatabase",
+    "StageLog",
+    "file_hash",
+    "generator_version",
+]
@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from plot_spec_utils import (
     FigureSpec,
@@ -17,6 +19,36 @@ from plot_spec_utils import (
     load_data,
     load_spec,
 )
+from plot_dashboard import dashboard_payload, write_dashboard
+from plot_derived import (
+    DERIVED_BASE_NAME,
+    base_columns,
+    describe_columns,
+    forward_fill,
+    running_total,
+    write_base_columns,
+)
+from plot_live import delta_path, live_options, write_delta
+from plot_service_worker import PLOTS_SUBDIR, read_artifacts, write_service_worker
+from plot_pyramid import (
+    BASE_LEVEL_POINTS,
+    PYRAMID_DIR,
+    apply_level,
+    build_levels,
+    collect_columns,
+    runtime_options,
+    write_pyramid,
+)
+from static_assets import (
+    ASSETS_DIR,
+    PLOTLY_CDN,
+    publish_runtime,
+    record_artifacts,
+    relative_url,
+    select_plotly_bundle,
+    vendor_plotly,
+    write_if_changed,
+)
 
 LINESTYLE_MAP = {
     "-": "solid",
@@ -40,7 +72,10 @@ LEGEND_LOCATIONS = {
 
 TOP_LEGEND_TARGET_Y = 0.80
 
-PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.31.1.min.js"
+# Traces with more plotted points than this render through WebGL (scattergl).
+WEBGL_POINT_THRESHOLD = 5000
+# Trace types a storm's charts can mix: plain lines, and lines promoted to WebGL.
+CHART_TRACE_TYPES = (frozenset({"scatter"}), frozenset({"scatter", "scattergl"}))
 
 
 def extract_units(label: Optional[str]) -> str:
@@ -215,30 +250,6 @@ def _is_cumulative_series(values: List[Optional[float]]) -> bool:
     return True
 
 
-def _forward_fill(values: List[Optional[float]]) -> List[Optional[float]]:
-    filled: List[Optional[float]] = []
-    last: Optional[float] = None
-    for value in values:
-        if value is None:
-            filled.append(last)
-        else:
-            last = value
-            filled.append(last)
-    return filled
-
-
-def _accumulate_incremental(values: List[Optional[float]]) -> List[Optional[float]]:
-    totals: List[Optional[float]] = []
-    running: Optional[float] = None
-    for value in values:
-        if value is None:
-            totals.append(running)
-            continue
-        running = (running or 0.0) + value
-        totals.append(running)
-    return totals
-
-
 def find_rain_accumulation_column(
     columns: Dict[str, List[Optional[float]]]
 ) -> Optional[Tuple[str, List[Optional[float]]]]:
@@ -257,10 +268,10 @@ def find_rain_accumulation_column(
             continue
 
         if "total" in key.lower() or _is_cumulative_series(values):
-            totals = _forward_fill(values)
+            totals = forward_fill(values)
             label = key
         else:
-            totals = _accumulate_incremental(values)
+            totals = running_total(values)
             label = "Rain Accumulation"
 
         if any(value is not None for value in totals):
@@ -285,7 +296,12 @@ def build_hover_details(
     base_unit: str,
     values_length: int,
     extras: List[HoverEntry],
-) -> Tuple[str, Optional[List[List[Optional[float]]]]]:
+) -> Tuple[str, Optional[List[List[Optional[float]]]], Dict[str, object]]:
+    """Return the Plotly hovertemplate, its customdata and tooltip metadata.
+
+    The metadata carries the same labels, formats and units so the runtime
+    can render scrub tooltips without going through Plotly's hover.
+    """
     extra_template = ""
     customdata: Optional[List[List[Optional[float]]]] = None
     if extras:
@@ -302,11 +318,46 @@ def build_hover_details(
         f" %{{y{base_format}}}{format_unit_suffix(base_unit)}"
         f"{extra_template}<extra></extra>"
     )
-    return hovertemplate, customdata
+    tooltip: Dict[str, object] = {
+        "label": base_label,
+        "format": base_format,
+        "unit": base_unit,
+        "extras": [
+            {"label": entry.label, "format": entry.hover_format, "unit": entry.unit}
+            for entry in extras
+        ],
+    }
+    return hovertemplate, customdata, tooltip
+
+
+def register_source(
+    columns: Dict[str, List[Optional[float]]], name: str, values: List[Optional[float]]
+) -> str:
+    key = name
+    suffix = 2
+    while key in columns and columns[key] is not values:
+        key = f"{name} ({suffix})"
+        suffix += 1
+    columns[key] = values
+    return key
+
+
+def trace_source(
+    columns: Dict[str, List[Optional[float]]], meta: ProcessedSeries, extras: List[HoverEntry]
+) -> Dict[str, object]:
+    source: Dict[str, object] = {"y": register_source(columns, meta.series.column, meta.values)}
+    if extras:
+        source["customdata"] = [
+            register_source(columns, entry.label, entry.values) for entry in extras
+        ]
+    return source
 
 
 def build_single_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
     traces: List[Dict[str, object]] = []
+    sources: List[Dict[str, object]] = []
+    tooltips: List[Dict[str, object]] = []
+    source_columns: Dict[str, List[Optional[float]]] = {}
     legend_name = None
     layout: Dict[str, object] = {
         "hovermode": "x unified",
@@ -366,7 +417,7 @@ def build_single_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
                     hover_format=":.2f",
                 )
             )
-        hovertemplate, customdata = build_hover_details(
+        hovertemplate, customdata, tooltip = build_hover_details(
             meta.label,
             meta.hover_format,
             meta.unit,
@@ -403,6 +454,8 @@ def build_single_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
             trace["showlegend"] = True
             force_persistent_legend = True
         traces.append(trace)
+        sources.append(trace_source(source_columns, meta, extras))
+        tooltips.append(tooltip)
     if force_persistent_legend:
         layout["showlegend"] = True
     yaxis = {
@@ -491,7 +544,15 @@ def build_single_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
         "scrollZoom": True,
         "doubleClick": "reset",
     }
-    return {"data": traces, "layout": layout, "config": config}
+    return {
+        "data": traces,
+        "layout": layout,
+        "config": config,
+        "times": data.times,
+        "sources": sources,
+        "columns": source_columns,
+        "tooltip": {"time_format": time_fmt, "series": tooltips},
+    }
 
 
 def axis_name(prefix: str, index: int) -> str:
@@ -511,6 +572,9 @@ def build_grid_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
     cols = int(spec.cols or 1)
     domains = compute_domains(rows, cols)
     traces: List[Dict[str, object]] = []
+    sources: List[Dict[str, object]] = []
+    tooltips: List[Dict[str, object]] = []
+    source_columns: Dict[str, List[Optional[float]]] = {}
     layout: Dict[str, object] = {
         "hovermode": "x unified",
         "plot_bgcolor": "#ffffff",
@@ -582,7 +646,7 @@ def build_grid_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
                         hover_format=":.2f",
                     )
                 )
-            hovertemplate, customdata = build_hover_details(
+            hovertemplate, customdata, tooltip = build_hover_details(
                 meta.label,
                 meta.hover_format,
                 meta.unit,
@@ -624,6 +688,8 @@ def build_grid_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
                 trace["showlegend"] = True
                 force_persistent_legend = True
             traces.append(trace)
+            sources.append(trace_source(source_columns, meta, extras))
+            tooltips.append(tooltip)
         # Primary axis definition
         xaxis_name = axis_name("x", index)
         yaxis_name = axis_name("y", index)
@@ -746,7 +812,15 @@ def build_grid_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
         "scrollZoom": True,
         "doubleClick": "reset",
     }
-    return {"data": traces, "layout": layout, "config": config}
+    return {
+        "data": traces,
+        "layout": layout,
+        "config": config,
+        "times": data.times,
+        "sources": sources,
+        "columns": source_columns,
+        "tooltip": {"time_format": time_fmt, "series": tooltips},
+    }
 
 
 def build_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
@@ -755,576 +829,268 @@ def build_figure(spec: FigureSpec, data: StormData) -> Dict[str, object]:
     return build_single_figure(spec, data)
 
 
+def promote_dense_traces(figure: Dict[str, object], threshold: int) -> None:
+    if threshold <= 0:
+        return
+    for trace in figure["data"]:
+        if trace.get("type") != "scatter":
+            continue
+        points = sum(1 for value in trace.get("y") or [] if value is not None)
+        if points > threshold:
+            trace["type"] = "scattergl"
+
+
 def ensure_output_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def write_html(path: Path, figure: Dict[str, object]) -> None:
-    figure_json = json.dumps({"data": figure["data"], "layout": figure["layout"]})
+def plotly_fallback_script(plotly_url: str) -> str:
+    """Load Plotly from the CDN when a vendored bundle failed to load."""
+    if plotly_url == PLOTLY_CDN:
+        return ""
+    return (
+        "\n  <script>window.Plotly || document.write('<script src=\""
+        f"{PLOTLY_CDN}\"><\\/script>');</script>"
+    )
+
+
+def write_html(
+    path: Path,
+    figure: Dict[str, object],
+    *,
+    runtime_url: str,
+    plotly_url: str = PLOTLY_CDN,
+    pyramid: Optional[Dict[str, object]] = None,
+    perf: bool = False,
+    derived: Optional[Dict[str, object]] = None,
+    live: Optional[Dict[str, object]] = None,
+) -> None:
+    times = figure["times"]
+    derived_columns = derived["columns"] if derived else {}
+    # Every trace plots against the storm's time axis; ship it once, or not at
+    # all when the page reads it from the base file. Arrays the runtime
+    # derives from the base columns are left out as well.
+    traces = []
+    for trace, source in zip(figure["data"], figure["sources"]):
+        omitted = {"x"} if trace.get("x") is times else set()
+        if source["y"] in derived_columns:
+            omitted.add("y")
+        extras = source.get("customdata") or []
+        if extras and all(name in derived_columns for name in extras):
+            omitted.add("customdata")
+        traces.append({key: value for key, value in trace.items() if key not in omitted})
+    payload: Dict[str, object] = {
+        "data": traces,
+        "layout": figure["layout"],
+        "tooltip": figure["tooltip"],
+    }
+    if derived:
+        payload["derived"] = derived
+    else:
+        payload["times"] = times
+    figure_json = json.dumps(payload)
     config_json = json.dumps(figure["config"])
+    options: Dict[str, object] = {"pyramid": pyramid}
+    if live:
+        options["live"] = live
+    perf_mark = ""
+    if perf:
+        # Stages are measured from this mark; ?perf=1 shows them on the chart.
+        options["perf"] = True
+        perf_mark = "\n  <script>performance.mark('wxchart:script-start');</script>"
+    options_json = json.dumps(options)
+    plotly_fallback = plotly_fallback_script(plotly_url)
     html = f"""<!DOCTYPE html>
 <html lang=\"en\">
 <head>
   <meta charset=\"utf-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <script src=\"{PLOTLY_CDN}\"></script>
+  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />{perf_mark}
+  <script src=\"{plotly_url}\"></script>{plotly_fallback}
+  <script src=\"{runtime_url}\"></script>
   <style>
-    body {{ margin: 0; padding: 0; }}
+    body {{ margin: 0; padding: 0; overscroll-behavior: contain; }}
     #chart {{ width: 100%; height: 100vh; }}
   </style>
 </head>
 <body>
   <div id=\"chart\"></div>
   <script>
-    const figure = {figure_json};
-    const config = {config_json};
-    const toTimestamp = (value) => {{
-      if (value === null || value === undefined) {{
-        return NaN;
-      }}
-      if (typeof value === 'number') {{
-        return value;
-      }}
-      const parsed = Date.parse(value);
-      return Number.isNaN(parsed) ? NaN : parsed;
-    }};
-    Plotly.newPlot('chart', figure.data, figure.layout, config).then((gd) => {{
-      const captureInitialView = () => {{
-        const fullLayout = gd._fullLayout;
-        if (!fullLayout) {{
-          return {{}};
-        }}
-        const state = {{}};
-        Object.keys(fullLayout).forEach((key) => {{
-          if (!key.startsWith('xaxis') && !key.startsWith('yaxis')) {{
-            return;
-          }}
-          const axis = fullLayout[key];
-          if (!axis || typeof axis !== 'object') {{
-            return;
-          }}
-          if (axis.autorange) {{
-            state[`${{key}}.autorange`] = true;
-          }} else if (Array.isArray(axis.range)) {{
-            state[`${{key}}.range`] = axis.range.slice();
-          }} else if (Array.isArray(axis._range)) {{
-            state[`${{key}}.range`] = axis._range.slice();
-          }}
-        }});
-        return state;
-      }};
-      let initialViewState = captureInitialView();
-      const ensureInitialViewState = () => {{
-        if (!initialViewState || !Object.keys(initialViewState).length) {{
-          initialViewState = captureInitialView();
-        }}
-      }};
-      const resetToInitialView = () => {{
-        ensureInitialViewState();
-        const relayoutUpdate = {{}};
-        Object.keys(initialViewState || {{}}).forEach((key) => {{
-          const value = initialViewState[key];
-          relayoutUpdate[key] = Array.isArray(value) ? value.slice() : value;
-        }});
-        if (Object.keys(relayoutUpdate).length) {{
-          Plotly.relayout(gd, relayoutUpdate);
-        }}
-      }};
-      const clearHoverTitles = () => {{
-        const fullLayout = gd._fullLayout;
-        if (!fullLayout) {{
-          return;
-        }}
-        Object.keys(fullLayout).forEach((key) => {{
-          if (!key.startsWith('xaxis')) {{
-            return;
-          }}
-          const axis = fullLayout[key];
-          if (axis && typeof axis === 'object') {{
-            axis._hovertitle = '';
-          }}
-        }});
-      }};
-      clearHoverTitles();
-      ensureInitialViewState();
-      gd.on('plotly_afterplot', ensureInitialViewState);
-      gd.on('plotly_afterplot', clearHoverTitles);
-      gd.on('plotly_relayout', clearHoverTitles);
-      gd.on('plotly_restyle', clearHoverTitles);
-      gd.on('plotly_update', clearHoverTitles);
-      const originalCount = gd.data.length;
-      const originalTraces = gd.data.slice(0, originalCount);
-      const highlightTraces = [];
-      const highlightIndexMap = new Map();
-      originalTraces.forEach((trace, index) => {{
-        if (trace.type !== 'scatter') {{
-          highlightIndexMap.set(index, null);
-          return;
-        }}
-        const color = trace.line && trace.line.color ? trace.line.color : '#1f77b4';
-        highlightIndexMap.set(index, originalCount + highlightTraces.length);
-        highlightTraces.push({{
-          x: [trace.x && trace.x.length ? trace.x[0] : null],
-          y: [trace.y && trace.y.length ? trace.y[0] : null],
-          mode: 'markers',
-          marker: {{
-            size: 10,
-            color,
-            symbol: 'circle',
-            line: {{ color: 'rgba(0, 0, 0, 0.85)', width: 2 }},
-            opacity: 1
-          }},
-          showlegend: false,
-          hoverinfo: 'skip',
-          xaxis: trace.xaxis,
-          yaxis: trace.yaxis,
-          visible: false,
-          cliponaxis: false
-        }});
-      }});
-      const addHighlights = highlightTraces.length ? Plotly.addTraces(gd, highlightTraces) : Promise.resolve();
-      const dataLookup = originalTraces.map((trace, curveNumber) => {{
-        if (!trace.x || !trace.y) {{
-          return [];
-        }}
-        const entries = [];
-        const subplotRef = (trace.xaxis || 'x') + (trace.yaxis || 'y');
-        for (let i = 0; i < trace.x.length; i += 1) {{
-          const xValue = trace.x[i];
-          const yValue = trace.y[i];
-          if (yValue === null || typeof yValue === 'undefined') {{
-            continue;
-          }}
-          const timestamp = toTimestamp(xValue);
-          if (!Number.isFinite(timestamp)) {{
-            continue;
-          }}
-          entries.push({{ time: timestamp, x: xValue, y: yValue, index: i, curveNumber, subplot: subplotRef }});
-        }}
-        return entries;
-      }});
-      let suppressSyntheticHover = false;
-      let pendingHoverState = null;
-      let currentHoverTargetTime = null;
-      let hasActiveHover = false;
-      function hideHighlights() {{
-        highlightIndexMap.forEach((highlightIdx) => {{
-          if (highlightIdx === null) {{
-            return;
-          }}
-          Plotly.restyle(gd, {{ visible: false }}, highlightIdx);
-        }});
-        hasActiveHover = false;
-        currentHoverTargetTime = null;
-      }}
-      function findMatch(entries, targetTime) {{
-        let exact = null;
-        let best = null;
-        let bestDiff = Infinity;
-        for (const entry of entries) {{
-          const diff = Math.abs(entry.time - targetTime);
-          if (diff === 0) {{
-            exact = entry;
-            break;
-          }}
-          if (diff < bestDiff) {{
-            bestDiff = diff;
-            best = entry;
-          }}
-        }}
-        return exact || best;
-      }}
-      function queuePendingHover(points, isUserEvent) {{
-        if (!isUserEvent) {{
-          return;
-        }}
-        if (!points || !points.length) {{
-          pendingHoverState = {{ hasPoints: false }};
-          return;
-        }}
-        const targetTime = toTimestamp(points[0].x);
-        if (!Number.isFinite(targetTime)) {{
-          pendingHoverState = {{ hasPoints: false }};
-          return;
-        }}
-        pendingHoverState = {{ hasPoints: true, targetTime }};
-      }}
-      function flushPendingHover() {{
-        if (!pendingHoverState) {{
-          return;
-        }}
-        const state = pendingHoverState;
-        pendingHoverState = null;
-        if (!state.hasPoints) {{
-          hideHighlights();
-          Plotly.Fx.unhover(gd);
-          return;
-        }}
-        applyHoverForTime(state.targetTime);
-      }}
-      function applyHoverForTime(targetTime) {{
-        const hoverPoints = [];
-        highlightIndexMap.forEach((highlightIdx, sourceIdx) => {{
-          if (highlightIdx === null) {{
-            return;
-          }}
-          const entries = dataLookup[sourceIdx];
-          if (!entries || !entries.length) {{
-            Plotly.restyle(gd, {{ visible: false }}, highlightIdx);
-            return;
-          }}
-          const match = findMatch(entries, targetTime);
-          if (!match) {{
-            Plotly.restyle(gd, {{ visible: false }}, highlightIdx);
-            return;
-          }}
-          Plotly.restyle(gd, {{ x: [[match.x]], y: [[match.y]], visible: true }}, highlightIdx);
-          hoverPoints.push({{ curveNumber: match.curveNumber, pointNumber: match.index, subplot: match.subplot }});
-        }});
-        const uniquePoints = hoverPoints.filter((point, idx, arr) =>
-          arr.findIndex(
-            (p) =>
-              p.curveNumber === point.curveNumber &&
-              p.pointNumber === point.pointNumber &&
-              p.subplot === point.subplot
-          ) === idx
-        );
-        hasActiveHover = uniquePoints.length > 0;
-        currentHoverTargetTime = hasActiveHover ? targetTime : null;
-        suppressSyntheticHover = true;
-        if (uniquePoints.length) {{
-          Plotly.Fx.hover(gd, uniquePoints);
-        }} else {{
-          Plotly.Fx.unhover(gd);
-        }}
-        setTimeout(() => {{
-          suppressSyntheticHover = false;
-          flushPendingHover();
-        }}, 0);
-      }}
-      function reapplyCurrentHover() {{
-        if (!hasActiveHover || currentHoverTargetTime === null) {{
-          return;
-        }}
-        applyHoverForTime(currentHoverTargetTime);
-      }}
-      function isCoarsePointerDevice() {{
-        if (typeof window === 'undefined') {{
-          return false;
-        }}
-        if (typeof window.matchMedia === 'function') {{
-          try {{
-            if (window.matchMedia('(pointer: coarse)').matches) {{
-              return true;
-            }}
-          }} catch (err) {{
-            // Ignore errors from matchMedia
-          }}
-        }}
-        return 'ontouchstart' in window;
-      }}
-      function setupTouchHover() {{
-        const root = gd;
-        if (!root || typeof root.addEventListener !== 'function') {{
-          return;
-        }}
-        let activeTouchId = null;
-        let isScrubbing = false;
-        let touchTargets = [];
-        const DOUBLE_TAP_MS = 300;
-        let lastTapTimestamp = 0;
-        let doubleTapTimeoutId = null;
-        const resetTapTracking = () => {{
-          if (doubleTapTimeoutId) {{
-            clearTimeout(doubleTapTimeoutId);
-            doubleTapTimeoutId = null;
-          }}
-          lastTapTimestamp = 0;
-        }};
-        const scheduleTapReset = () => {{
-          if (doubleTapTimeoutId) {{
-            clearTimeout(doubleTapTimeoutId);
-          }}
-          doubleTapTimeoutId = setTimeout(() => {{
-            doubleTapTimeoutId = null;
-            lastTapTimestamp = 0;
-          }}, DOUBLE_TAP_MS);
-        }};
-        const refreshTouchTargets = () => {{
-          const fullLayout = gd._fullLayout;
-          if (!fullLayout || !fullLayout._plots) {{
-            touchTargets = [];
-            return;
-          }}
-          touchTargets = Object.keys(fullLayout._plots)
-            .map((subplot) => {{
-              const plot = fullLayout._plots[subplot];
-              if (!plot || !plot.xaxis || !plot.yaxis) {{
-                return null;
-              }}
-              const xaxis = plot.xaxis;
-              const yaxis = plot.yaxis;
-              if (
-                typeof xaxis._length !== 'number' ||
-                xaxis._length <= 0 ||
-                typeof yaxis._length !== 'number' ||
-                yaxis._length <= 0
-              ) {{
-                return null;
-              }}
-              return {{ axis: xaxis, yaxis }};
-            }})
-            .filter((entry) => Boolean(entry));
-        }};
-        const findTouchTarget = (clientX, clientY) => {{
-          if (!touchTargets.length) {{
-            return null;
-          }}
-          const rootRect = root.getBoundingClientRect();
-          for (const entry of touchTargets) {{
-            const axis = entry.axis;
-            const yaxis = entry.yaxis;
-            if (!axis || !yaxis) {{
-              continue;
-            }}
-            const left =
-              rootRect.left + (typeof axis._offset === 'number' ? axis._offset : 0);
-            const width = typeof axis._length === 'number' ? axis._length : 0;
-            const top =
-              rootRect.top + (typeof yaxis._offset === 'number' ? yaxis._offset : 0);
-            const height = typeof yaxis._length === 'number' ? yaxis._length : 0;
-            if (width <= 0 || height <= 0) {{
-              continue;
-            }}
-            const right = left + width;
-            const bottom = top + height;
-            if (
-              clientX >= left &&
-              clientX <= right &&
-              clientY >= top &&
-              clientY <= bottom
-            ) {{
-              return {{
-                axis,
-                rect: {{ left, right, top, bottom, width, height }}
-              }};
-            }}
-          }}
-          return null;
-        }};
-        const computeTargetTime = (axis, rect, clientX) => {{
-          if (!axis || !rect) {{
-            return NaN;
-          }}
-          const range = axis.range || axis._range;
-          if (!range || range.length < 2) {{
-            return NaN;
-          }}
-          const start = toTimestamp(range[0]);
-          const end = toTimestamp(range[1]);
-          if (!Number.isFinite(start) || !Number.isFinite(end) || start === end) {{
-            return NaN;
-          }}
-          const clamped = Math.min(Math.max(clientX, rect.left), rect.right);
-          const span = rect.width || rect.right - rect.left;
-          const length = span > 0 ? span : 1;
-          const ratio = (clamped - rect.left) / length;
-          return start + ratio * (end - start);
-        }};
-        const preventInteractionDefaults = (event) => {{
-          if (!event) {{
-            return;
-          }}
-          event.preventDefault();
-          event.stopPropagation();
-          if (typeof event.stopImmediatePropagation === 'function') {{
-            event.stopImmediatePropagation();
-          }}
-        }};
-        const beginScrub = (touch) => {{
-          const target = findTouchTarget(touch.clientX, touch.clientY);
-          if (!target) {{
-            return false;
-          }}
-          const targetTime = computeTargetTime(target.axis, target.rect, touch.clientX);
-          if (!Number.isFinite(targetTime)) {{
-            return false;
-          }}
-          applyHoverForTime(targetTime);
-          return true;
-        }};
-        const activateScrubSession = (touch, event) => {{
-          const started = beginScrub(touch);
-          if (!started) {{
-            return false;
-          }}
-          activeTouchId = touch.identifier;
-          isScrubbing = true;
-          preventInteractionDefaults(event);
-          return true;
-        }};
-        const moveScrub = (touch) => {{
-          const target = findTouchTarget(touch.clientX, touch.clientY);
-          if (!target) {{
-            hideHighlights();
-            Plotly.Fx.unhover(gd);
-            return false;
-          }}
-          const targetTime = computeTargetTime(target.axis, target.rect, touch.clientX);
-          if (!Number.isFinite(targetTime)) {{
-            hideHighlights();
-            Plotly.Fx.unhover(gd);
-            return false;
-          }}
-          applyHoverForTime(targetTime);
-          return true;
-        }};
-        const endScrub = () => {{
-          isScrubbing = false;
-          activeTouchId = null;
-          pendingHoverState = null;
-          hideHighlights();
-          Plotly.Fx.unhover(gd);
-        }};
-        const handleTouchEnd = (event) => {{
-          if (!isScrubbing || activeTouchId === null) {{
-            return;
-          }}
-          const remaining = Array.from(event.touches || []);
-          const stillActive = remaining.some((touch) => touch.identifier === activeTouchId);
-          if (stillActive) {{
-            return;
-          }}
-          preventInteractionDefaults(event);
-          endScrub();
-        }};
-        const handleDoubleTap = (event) => {{
-          const now = Date.now();
-          if (lastTapTimestamp && now - lastTapTimestamp <= DOUBLE_TAP_MS) {{
-            resetTapTracking();
-            endScrub();
-            hideHighlights();
-            Plotly.Fx.unhover(gd);
-            resetToInitialView();
-            preventInteractionDefaults(event);
-            return true;
-          }}
-          lastTapTimestamp = now;
-          scheduleTapReset();
-          return false;
-        }};
-        refreshTouchTargets();
-        gd.on('plotly_afterplot', refreshTouchTargets);
-        gd.on('plotly_relayout', refreshTouchTargets);
-        gd.on('plotly_update', refreshTouchTargets);
-        const handleHoverDuringLayoutChange = () => {{
-          reapplyCurrentHover();
-        }};
-        gd.on('plotly_relayouting', handleHoverDuringLayoutChange);
-        gd.on('plotly_relayout', handleHoverDuringLayoutChange);
-        gd.on('plotly_update', handleHoverDuringLayoutChange);
-        if (typeof window !== 'undefined') {{
-          window.addEventListener('resize', refreshTouchTargets);
-          window.addEventListener('scroll', handleHoverDuringLayoutChange, {{ passive: true }});
-        }}
-        root.addEventListener(
-          'touchstart',
-          (event) => {{
-            refreshTouchTargets();
-            if (event.touches.length !== 1) {{
-              if (isScrubbing) {{
-                endScrub();
-              }}
-              resetTapTracking();
-              return;
-            }}
-            const touch = event.touches[0];
-            if (handleDoubleTap(event)) {{
-              return;
-            }}
-            const started = activateScrubSession(touch, event);
-            if (!started) {{
-              isScrubbing = false;
-              activeTouchId = null;
-            }}
-          }},
-          {{ passive: false }}
-        );
-        root.addEventListener(
-          'touchmove',
-          (event) => {{
-            const touches = Array.from(event.touches || []);
-            if (!touches.length) {{
-              return;
-            }}
-            let touch = touches.find((item) => item.identifier === activeTouchId);
-            if (!touch) {{
-              if (touches.length !== 1) {{
-                return;
-              }}
-              touch = touches[0];
-            }}
-            if (!touch) {{
-              return;
-            }}
-            if (!isScrubbing || activeTouchId === null) {{
-              refreshTouchTargets();
-              const started = activateScrubSession(touch, event);
-              if (!started) {{
-                return;
-              }}
-            }}
-            const moved = moveScrub(touch);
-            if (moved) {{
-              preventInteractionDefaults(event);
-            }}
-          }},
-          {{ passive: false }}
-        );
-        root.addEventListener('touchend', handleTouchEnd);
-        root.addEventListener('touchcancel', handleTouchEnd);
-      }}
-      addHighlights.then(() => {{
-        if (!highlightTraces.length) {{
-          return;
-        }}
-        gd.on('plotly_hover', (event) => {{
-          if (suppressSyntheticHover) {{
-            queuePendingHover(event.points, Boolean(event.event));
-            return;
-          }}
-          if (!event.points || !event.points.length) {{
-            hideHighlights();
-            return;
-          }}
-          const targetTime = toTimestamp(event.points[0].x);
-          if (!Number.isFinite(targetTime)) {{
-            hideHighlights();
-            return;
-          }}
-          applyHoverForTime(targetTime);
-        }});
-        gd.on('plotly_unhover', (event) => {{
-          if (suppressSyntheticHover) {{
-            queuePendingHover(null, Boolean(event && event.event));
-            return;
-          }}
-          pendingHoverState = null;
-          hideHighlights();
-          if (event && event.event) {{
-            Plotly.Fx.unhover(gd);
-          }}
-        }});
-        if (isCoarsePointerDevice()) {{
-          setupTouchHover();
-        }}
-      }});
-    }});
+    WxChart.render('chart', {figure_json}, {config_json}, {options_json});
   </script>
 </body>
 </html>
 """
-    path.write_text(html, encoding="utf-8")
+    write_if_changed(path, html)
+
+
+@dataclass
+class SharedAssets:
+    """Scripts every chart page loads, published once per build run.
+
+    A pipeline building several storms in one process shares one instance so
+    the runtime is minified and Plotly vendored a single time.
+    """
+
+    assets_dir: Path = ASSETS_DIR
+    runtime_path: Optional[Path] = None
+    # Bundles the run's charts load, by trace types; only these are recorded.
+    bundles: Dict[FrozenSet[str], Optional[Path]] = field(default_factory=dict)
+    vendored: Dict[Optional[str], Optional[Path]] = field(default_factory=dict)
+
+    def runtime(self) -> Path:
+        if self.runtime_path is None:
+            self.runtime_path = publish_runtime(self.assets_dir)
+        return self.runtime_path
+
+    def plotly(self, trace_types: Set[str]) -> Optional[Path]:
+        key = frozenset(trace_types)
+        if key not in self.bundles:
+            self.bundles[key] = self.vendor(key)
+        return self.bundles[key]
+
+    def vendor(self, trace_types: FrozenSet[str]) -> Optional[Path]:
+        bundle = select_plotly_bundle(trace_types)
+        path = self.vendored.get(bundle)
+        if bundle not in self.vendored or (path is not None and not path.is_file()):
+            self.vendored[bundle] = vendor_plotly(trace_types, self.assets_dir)
+        return self.vendored[bundle]
+
+    def prepare(self) -> None:
+        """Publish the runtime and vendor every bundle the charts may load.
+
+        Runs before any stage is skipped, so a deleted script is restored even
+        when every storm is up to date. Build workers get copies of this
+        instance, so they reuse what is resolved here instead of each fetching
+        it again.
+        """
+        self.runtime_path = publish_runtime(self.assets_dir)
+        for trace_types in CHART_TRACE_TYPES:
+            self.vendor(trace_types)
+
+    def record(self, output_dirs: Iterable[Path]) -> None:
+        """Record the published scripts and refresh the service worker.
+
+        Only site builds feed the service worker; ad hoc output directories
+        outside assets/plots are not served under its scope.
+        """
+        js_dir = self.assets_dir / "js"
+        published = {path for path in self.bundles.values() if path is not None}
+        if self.runtime_path is not None:
+            published.add(self.runtime_path)
+        # Pages that were not rebuilt still load the scripts earlier runs
+        # recorded; re-recording them restores any missing .gz/.br copies.
+        for name in read_artifacts(js_dir):
+            if (js_dir / name).is_file():
+                published.add(js_dir / name)
+        record_artifacts(js_dir, sorted(published))
+        plots_dir = (self.assets_dir / PLOTS_SUBDIR).resolve()
+        if any(plots_dir in path.resolve().parents for path in output_dirs):
+            write_service_worker(self.assets_dir)
+
+
+def build_charts(
+    figures: List[FigureSpec],
+    data: StormData,
+    output_dir: Path,
+    *,
+    assets: SharedAssets,
+    pyramid: bool = False,
+    webgl_threshold: int = WEBGL_POINT_THRESHOLD,
+    dashboard: bool = False,
+    derive: bool = False,
+    live: bool = False,
+    perf: bool = False,
+) -> List[Path]:
+    """Write one HTML page per figure (plus the optional extras); return them.
+
+    Shared scripts are published through ``assets``; call its ``record`` once
+    the run's charts are built.
+    """
+    ensure_output_directory(output_dir)
+    runtime_url = relative_url(assets.runtime(), output_dir)
+
+    built = [(spec, build_figure(spec, data)) for spec in figures]
+    shared_columns = collect_columns([figure for _, figure in built])
+    coarsest = None
+    if pyramid and len(data.times) > BASE_LEVEL_POINTS:
+        levels = build_levels(data.times, shared_columns)
+        write_pyramid(output_dir, levels)
+        coarsest = levels[0]
+    for _, figure in built:
+        if coarsest is not None:
+            apply_level(figure, coarsest)
+        promote_dense_traces(figure, webgl_threshold)
+
+    trace_types = {trace["type"] for _, figure in built for trace in figure["data"]}
+    vendored = assets.plotly(trace_types)
+    plotly_url = relative_url(vendored, output_dir) if vendored else PLOTLY_CDN
+
+    written: List[Path] = []
+    # Pyramid levels aggregate the raw record, so nothing derives from or
+    # appends to them.
+    overridden = [flag for flag, on in (("--derive", derive), ("--live", live)) if on]
+    if coarsest is not None and overridden:
+        print(
+            f"{output_dir.name}: {len(data.times)} rows use the data pyramid; "
+            f"{' and '.join(overridden)} ignored for these charts",
+            file=sys.stderr,
+        )
+    derive = derive and coarsest is None
+    live_mode = live and coarsest is None
+    descriptors = [
+        describe_columns(figure["columns"], data) if derive else {} for _, figure in built
+    ]
+    if derive:
+        # Every page reads the time axis from the base file, so it is written
+        # even when no column derives.
+        written.append(write_base_columns(output_dir, data.times, base_columns(descriptors, data)))
+    for (spec, figure), described in zip(built, descriptors):
+        html_path = output_dir / Path(spec.outfile).with_suffix(".html").name
+        pyramid_options = None
+        if coarsest is not None:
+            pyramid_options = runtime_options(figure)
+        derived = None
+        if derive:
+            derived = {"url": DERIVED_BASE_NAME, "columns": described, "sources": figure["sources"]}
+        live_settings = None
+        if live_mode:
+            # Deltas stay out of the recorded artifacts so the service worker
+            # never answers a poll from its cache.
+            live_settings = live_options(write_delta(delta_path(html_path), figure))
+        write_html(
+            html_path,
+            figure,
+            runtime_url=runtime_url,
+            plotly_url=plotly_url,
+            pyramid=pyramid_options,
+            perf=perf,
+            derived=derived,
+            live=live_settings,
+        )
+        written.append(html_path)
+    if dashboard:
+        payload = dashboard_payload(
+            built,
+            coarsest.times if coarsest is not None else data.times,
+            coarsest.columns if coarsest is not None else shared_columns,
+            [runtime_options(figure) if coarsest is not None else None for _, figure in built],
+            describe_columns(shared_columns, data) if derive else None,
+            data,
+        )
+        written.extend(
+            write_dashboard(
+                output_dir,
+                payload,
+                title=output_dir.name.replace("-", " ").title(),
+                runtime_url=runtime_url,
+                plotly_url=plotly_url,
+                plotly_fallback=plotly_fallback_script(plotly_url),
+            )
+        )
+    if coarsest is not None:
+        written.extend(sorted((output_dir / PYRAMID_DIR).rglob("*.json")))
+    record_artifacts(output_dir, written)
+    return written
 
 
 def main() -> None:
@@ -1332,19 +1098,62 @@ def main() -> None:
     parser.add_argument("--csv", required=True, help="Path to the CSV data file")
     parser.add_argument("--spec", required=True, help="Path to the JSON spec file")
     parser.add_argument("--out", required=True, help="Directory to write HTML files")
+    parser.add_argument(
+        "--pyramid",
+        action="store_true",
+        help="Write pre-aggregated detail levels and load finer data on zoom",
+    )
+    parser.add_argument(
+        "--webgl-threshold",
+        type=int,
+        default=WEBGL_POINT_THRESHOLD,
+        help="Render traces with more points than this through WebGL (0 disables)",
+    )
+    parser.add_argument(
+        "--assets-dir",
+        default=str(ASSETS_DIR),
+        help="Site assets directory that receives the shared chart runtime",
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Also write one page that mounts every chart from a shared data payload",
+    )
+    parser.add_argument(
+        "--derive",
+        action="store_true",
+        help="Ship base columns and let the runtime compute pressure tendencies and rain totals",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Write a tail-window delta file per chart and poll it for new observations",
+    )
+    parser.add_argument(
+        "--perf",
+        action="store_true",
+        help=(
+            "Instrument charts with performance marks; WxChart.perfReport() returns the "
+            "report, and ?perf=1 adds an overlay and logs it once start-up completes"
+        ),
+    )
     args = parser.parse_args()
 
-    spec_path = Path(args.spec)
     output_dir = Path(args.out)
-    ensure_output_directory(output_dir)
-
-    figures = load_spec(spec_path)
-    data = load_data(Path(args.csv))
-
-    for spec in figures:
-        figure = build_figure(spec, data)
-        html_name = Path(spec.outfile).with_suffix(".html").name
-        write_html(output_dir / html_name, figure)
+    assets = SharedAssets(Path(args.assets_dir))
+    build_charts(
+        load_spec(Path(args.spec)),
+        load_data(Path(args.csv)),
+        output_dir,
+        assets=assets,
+        pyramid=args.pyramid,
+        webgl_threshold=args.webgl_threshold,
+        dashboard=args.dashboard,
+        derive=args.derive,
+        live=args.live,
+        perf=args.perf,
+    )
+    assets.record([output_dir])
 
 
 if __name__ == "__main__":
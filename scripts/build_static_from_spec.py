@@ -3,22 +3,34 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 import matplotlib
 
 matplotlib.use("Agg")
+# A fixed salt and no date stamp make every SVG byte-identical across
+# rebuilds, whichever worker drew it.
+matplotlib.rcParams["svg.hashsalt"] = "storm-plots"
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
 from zoneinfo import ZoneInfo
 
 from plot_spec_utils import FigureSpec, StormData, load_data, load_spec
+from static_assets import record_artifacts
 
 
 EASTERN = ZoneInfo("America/New_York")
+POSTER_SUFFIX = ".poster.svg"
+POSTER_SIZE = (10, 5.2)
+SVG_METADATA = {"Date": None}
+
+# Set only while a fork pool renders figures; workers inherit the parent's
+# loaded record copy-on-write instead of receiving a pickled copy.
+_FORK_STATE: Optional[Tuple[StormData, Path]] = None
 
 
 def to_datetime(values: Iterable[str]) -> List[datetime]:
@@ -116,9 +128,9 @@ def format_time_axis(fig: plt.Figure, axes: Iterable[plt.Axes], spec: FigureSpec
     fig.autofmt_xdate()
 
 
-def build_multi_panel(spec: FigureSpec, data: StormData, output_dir: Path) -> None:
+def build_multi_panel(spec: FigureSpec, data: StormData, output_dir: Path) -> Optional[Path]:
     if not spec.subplots or not spec.rows or not spec.cols:
-        return
+        return None
     timestamps = to_datetime(data.times)
     fig, ax_grid = plt.subplots(spec.rows, spec.cols, figsize=(14, 8), sharex=bool(spec.sharex))
     if spec.title:
@@ -150,8 +162,85 @@ def build_multi_panel(spec: FigureSpec, data: StormData, output_dir: Path) -> No
     if output_name.suffix.lower() not in {".svg"}:
         output_name = output_name.with_suffix(".svg")
     output_path = output_dir / output_name
-    fig.savefig(output_path, dpi=300, bbox_inches="tight", format="svg")
+    fig.savefig(output_path, dpi=300, bbox_inches="tight", format="svg", metadata=SVG_METADATA)
     plt.close(fig)
+    return output_path
+
+
+def poster_path(spec: FigureSpec, output_dir: Path) -> Path:
+    return output_dir / (Path(spec.outfile).stem + POSTER_SUFFIX)
+
+
+def build_poster(spec: FigureSpec, data: StormData, output_dir: Path) -> Optional[Path]:
+    """Render the initial view of a single interactive chart as a light SVG.
+
+    Storm pages show the poster until the reader asks for the live chart.
+    """
+    if not spec.series:
+        return None
+    timestamps = to_datetime(data.times)
+    fig, ax = plt.subplots(figsize=POSTER_SIZE)
+    prepare_axis(ax, spec, timestamps, False)
+    if spec.xlabel:
+        ax.set_xlabel(spec.xlabel)
+    plot_subplot(ax, spec, timestamps, data)
+    ax.margins(x=0)
+    format_time_axis(fig, [ax], spec)
+    fig.tight_layout()
+    output_path = poster_path(spec, output_dir)
+    # Leave text as <text> so the browser's fonts draw it; outlined glyphs
+    # would make up most of the file.
+    with matplotlib.rc_context({"svg.fonttype": "none"}):
+        fig.savefig(output_path, bbox_inches="tight", format="svg", metadata=SVG_METADATA)
+    plt.close(fig)
+    return output_path
+
+
+def build_static_figure(spec: FigureSpec, data: StormData, output_dir: Path) -> Optional[Path]:
+    if spec.type == "grid":
+        return build_multi_panel(spec, data, output_dir)
+    return build_poster(spec, data, output_dir)
+
+
+def _build_forked(spec: FigureSpec) -> Optional[Path]:
+    data, output_dir = _FORK_STATE
+    return build_static_figure(spec, data, output_dir)
+
+
+def draw_static(
+    figures: List[FigureSpec], data: StormData, output_dir: Path, *, workers: int = 1
+) -> List[Optional[Path]]:
+    """Render each figure's image; return its path, or None, in spec order.
+
+    With ``workers`` above one the figures are drawn on a fork pool. Results
+    come back in spec order, so the output does not depend on the pool.
+    """
+    global _FORK_STATE
+    ensure_output_directory(output_dir)
+    workers = min(workers, len(figures))
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # Multi-panel figures take longest; start them first.
+        order = sorted(range(len(figures)), key=lambda index: figures[index].type != "grid")
+        _FORK_STATE = (data, output_dir)
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                drawn = pool.map(_build_forked, [figures[index] for index in order], chunksize=1)
+        finally:
+            _FORK_STATE = None
+        paths = [path for _, path in sorted(zip(order, drawn))]
+    else:
+        paths = [build_static_figure(spec, data, output_dir) for spec in figures]
+    return paths
+
+
+def build_static(
+    figures: List[FigureSpec], data: StormData, output_dir: Path, *, workers: int = 1
+) -> List[Path]:
+    """Render multi-panel images and chart posters; return the written files."""
+    paths = draw_static(figures, data, output_dir, workers=workers)
+    written = [path for path in paths if path is not None]
+    record_artifacts(output_dir, written)
+    return written
 
 
 def main() -> None:
@@ -159,19 +248,20 @@ def main() -> None:
     parser.add_argument("--csv", required=True, help="Path to the CSV data file")
     parser.add_argument("--spec", required=True, help="Path to the JSON spec file")
     parser.add_argument("--out", required=True, help="Directory to write output images")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Draw up to this many figures at once in forked processes",
+    )
     args = parser.parse_args()
 
-    spec_path = Path(args.spec)
-    output_dir = Path(args.out)
-    ensure_output_directory(output_dir)
-
-    figures = load_spec(spec_path)
-    data = load_data(Path(args.csv))
-
-    for spec in figures:
-        if spec.type != "grid":
-            continue
-        build_multi_panel(spec, data, output_dir)
+    build_static(
+        load_spec(Path(args.spec)),
+        load_data(Path(args.csv)),
+        Path(args.out),
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,1880 @@
+/* WxManBran chart runtime: hover highlights, touch scrubbing, view reset and
+ * on-zoom detail loading for the charts written by build_interactive_from_spec.py.
+ */
+(function (global) {
+  'use strict';
+
+  const toTimestamp = (value) => {
+    if (value === null || value === undefined) {
+      return NaN;
+    }
+    if (typeof value === 'number') {
+      return value;
+    }
+    const parsed = Date.parse(value);
+    return Number.isNaN(parsed) ? NaN : parsed;
+  };
+
+  const LINE_TRACE_TYPES = new Set(['scatter', 'scattergl']);
+
+  // Traces that share an x array share one parsed time index.
+  const timeIndexes = new WeakMap();
+  const timeIndexFor = (values) => {
+    let index = timeIndexes.get(values);
+    if (!index) {
+      index = new Float64Array(values.length);
+      for (let i = 0; i < values.length; i += 1) {
+        index[i] = toTimestamp(values[i]);
+      }
+      timeIndexes.set(values, index);
+    }
+    return index;
+  };
+
+  // Index of the sample nearest ``target`` in an ascending time index.
+  const nearestIndex = (times, target) => {
+    let lo = 0;
+    let hi = times.length - 1;
+    if (hi < 0) {
+      return -1;
+    }
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (times[mid] < target) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    if (lo > 0 && Math.abs(times[lo - 1] - target) <= Math.abs(times[lo] - target)) {
+      return lo - 1;
+    }
+    return lo;
+  };
+
+  // Nearest sample with a value, walking outwards from the nearest time.
+  const nearestValidIndex = (times, valid, target) => {
+    const start = nearestIndex(times, target);
+    if (start < 0) {
+      return -1;
+    }
+    if (valid[start]) {
+      return start;
+    }
+    let left = start - 1;
+    let right = start + 1;
+    while (left >= 0 || right < times.length) {
+      while (left >= 0 && !valid[left]) {
+        left -= 1;
+      }
+      while (right < times.length && !valid[right]) {
+        right += 1;
+      }
+      if (left < 0 && right >= times.length) {
+        return -1;
+      }
+      if (left < 0) {
+        return right;
+      }
+      if (right >= times.length) {
+        return left;
+      }
+      return Math.abs(times[left] - target) <= Math.abs(times[right] - target) ? left : right;
+    }
+    return -1;
+  };
+
+  // Runs inside a Web Worker (serialised via toString), so it may only use
+  // what it defines itself.
+  function indexWorkerMain() {
+    self.onmessage = (event) => {
+      const { id, axes, traces } = event.data;
+      const times = axes.map((values) => {
+        const index = new Float64Array(values.length);
+        for (let i = 0; i < values.length; i += 1) {
+          const value = values[i];
+          index[i] = typeof value === 'number' ? value : value === null ? NaN : Date.parse(value);
+        }
+        return index;
+      });
+      const results = traces.map((trace) => {
+        const values = new Float64Array(trace.y);
+        const valid = new Uint8Array(values.length);
+        let count = 0;
+        for (let i = 0; i < values.length; i += 1) {
+          if (!Number.isNaN(values[i])) {
+            valid[i] = 1;
+            count += 1;
+          }
+        }
+        return { axis: trace.axis, valid, count };
+      });
+      const transfers = times.map((index) => index.buffer).concat(results.map((r) => r.valid.buffer));
+      self.postMessage({ id, times, results }, transfers);
+    };
+  }
+
+  let indexWorker = null;
+  let indexWorkerFailed = false;
+  let nextIndexJob = 0;
+  const indexJobs = new Map();
+  const getIndexWorker = () => {
+    if (indexWorker || indexWorkerFailed) {
+      return indexWorker;
+    }
+    try {
+      const source = `(${indexWorkerMain.toString()})();`;
+      const url = URL.createObjectURL(new Blob([source], { type: 'text/javascript' }));
+      indexWorker = new Worker(url);
+      indexWorker.onmessage = (event) => {
+        const job = indexJobs.get(event.data.id);
+        if (job) {
+          indexJobs.delete(event.data.id);
+          job.resolve(event.data);
+        }
+      };
+      indexWorker.onerror = () => {
+        indexWorkerFailed = true;
+        indexWorker = null;
+        indexJobs.forEach((job) => job.reject(new Error('Index worker failed')));
+        indexJobs.clear();
+      };
+    } catch (err) {
+      indexWorkerFailed = true;
+      indexWorker = null;
+    }
+    return indexWorker;
+  };
+
+  const indexSynchronously = (traces) =>
+    traces.map((trace) => {
+      const times = timeIndexFor(trace.x);
+      const valid = new Uint8Array(times.length);
+      let count = 0;
+      for (let i = 0; i < times.length; i += 1) {
+        const yValue = trace.y[i];
+        if (
+          yValue !== null &&
+          typeof yValue !== 'undefined' &&
+          !Number.isNaN(yValue) &&
+          Number.isFinite(times[i])
+        ) {
+          valid[i] = 1;
+          count += 1;
+        }
+      }
+      return { times, valid, count };
+    });
+
+  // Builds { times, valid, count } per trace off the main thread when a worker
+  // is available. Each distinct x array is parsed once and cached.
+  const computeIndexes = (traces) => {
+    const canUseWorker = typeof Worker !== 'undefined' && typeof Blob !== 'undefined';
+    const worker = canUseWorker && traces.length ? getIndexWorker() : null;
+    if (!worker) {
+      return Promise.resolve(indexSynchronously(traces));
+    }
+    const axes = [];
+    const axisSlots = new Map();
+    const payload = traces.map((trace) => {
+      let axis = -1;
+      if (!timeIndexes.has(trace.x)) {
+        if (!axisSlots.has(trace.x)) {
+          axisSlots.set(trace.x, axes.length);
+          axes.push(trace.x);
+        }
+        axis = axisSlots.get(trace.x);
+      }
+      const y = new Float64Array(trace.y.length);
+      for (let i = 0; i < y.length; i += 1) {
+        const value = trace.y[i];
+        y[i] = value === null || typeof value === 'undefined' ? NaN : value;
+      }
+      return { axis, y: y.buffer };
+    });
+    const id = nextIndexJob;
+    nextIndexJob += 1;
+    return new Promise((resolve, reject) => {
+      indexJobs.set(id, { resolve, reject });
+      worker.postMessage({ id, axes, traces: payload }, payload.map((entry) => entry.y));
+    })
+      .then(({ times, results }) => {
+        times.forEach((index, slot) => timeIndexes.set(axes[slot], index));
+        return traces.map((trace, k) => {
+          const index = timeIndexes.get(trace.x);
+          const valid = results[k].valid;
+          let count = results[k].count;
+          // The worker only sees y; drop samples whose time did not parse.
+          for (let i = 0; i < valid.length; i += 1) {
+            if (valid[i] && !Number.isFinite(index[i])) {
+              valid[i] = 0;
+              count -= 1;
+            }
+          }
+          return { times: index, valid, count };
+        });
+      })
+      .catch(() => indexSynchronously(traces));
+  };
+
+  const SYNC_MESSAGE = 'wxchart-sync';
+
+  const syncGroupFromLocation = () => {
+    if (typeof location === 'undefined' || typeof URLSearchParams === 'undefined') {
+      return null;
+    }
+    return new URLSearchParams(location.search).get('sync') || null;
+  };
+
+  // Charts embedded on one page with the same ?sync= group exchange hover
+  // time and x-range with their sibling frames. Outgoing updates are
+  // coalesced so each kind is posted at most once per animation frame.
+  const createSyncChannel = (group, onMessage) => {
+    if (!group || typeof window === 'undefined' || !window.parent || window.parent === window) {
+      return null;
+    }
+    const sender = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    const origin = location.origin && location.origin !== 'null' ? location.origin : '*';
+    const outgoing = new Map();
+    let frameRequested = false;
+    const flush = () => {
+      frameRequested = false;
+      const frames = window.parent.frames;
+      outgoing.forEach((payload, kind) => {
+        const message = { type: SYNC_MESSAGE, group, sender, kind, payload };
+        for (let i = 0; i < frames.length; i += 1) {
+          if (frames[i] !== window) {
+            frames[i].postMessage(message, origin);
+          }
+        }
+      });
+      outgoing.clear();
+    };
+    const receive = (event) => {
+      const message = event.data;
+      if (
+        !message ||
+        message.type !== SYNC_MESSAGE ||
+        message.group !== group ||
+        message.sender === sender ||
+        (origin !== '*' && event.origin !== origin)
+      ) {
+        return;
+      }
+      onMessage(message.kind, message.payload);
+    };
+    window.addEventListener('message', receive);
+    return {
+      dispose() {
+        window.removeEventListener('message', receive);
+      },
+      publish(kind, payload) {
+        outgoing.set(kind, payload);
+        if (!frameRequested) {
+          frameRequested = true;
+          requestAnimationFrame(flush);
+        }
+      }
+    };
+  };
+
+  // The builder ships the shared time axis once, in the page or in the base
+  // file; point every trace without its own x at that single array.
+  const withSharedTimes = (figure, times) => {
+    if (!Array.isArray(times)) {
+      return figure.data;
+    }
+    return figure.data.map((trace) => (trace.x ? trace : Object.assign({}, trace, { x: times })));
+  };
+
+  const toSamples = (values) => {
+    const samples = new Float64Array(values.length);
+    for (let i = 0; i < values.length; i += 1) {
+      const value = values[i];
+      samples[i] = value === null || value === undefined ? NaN : value;
+    }
+    return samples;
+  };
+
+  // Mirrors plot_derived.py; the builder only describes a column when these
+  // reproduce it exactly.
+  const DERIVATIONS = {
+    column: (base) => base,
+    running_total: (base) => {
+      const totals = new Float64Array(base.length);
+      let running = NaN;
+      for (let i = 0; i < base.length; i += 1) {
+        if (!Number.isNaN(base[i])) {
+          running = (Number.isNaN(running) ? 0 : running) + base[i];
+        }
+        totals[i] = running;
+      }
+      return totals;
+    },
+    forward_fill: (base) => {
+      const filled = new Float64Array(base.length);
+      let last = NaN;
+      for (let i = 0; i < base.length; i += 1) {
+        if (!Number.isNaN(base[i])) {
+          last = base[i];
+        }
+        filled[i] = last;
+      }
+      return filled;
+    },
+    tendency: (base, descriptor, wallClock) => {
+      const window = descriptor.minutes * 60000;
+      const scale = 10 ** descriptor.decimals;
+      const rows = new Map();
+      for (let i = 0; i < wallClock.length; i += 1) {
+        rows.set(wallClock[i], i);
+      }
+      const values = new Float64Array(base.length).fill(NaN);
+      for (let i = 0; i < base.length; i += 1) {
+        const earlier = rows.get(wallClock[i] - window);
+        if (earlier !== undefined) {
+          // + 0 turns -0 into 0 so it is not formatted as "-0.0".
+          values[i] = Math.round((base[i] - base[earlier]) * scale) / scale + 0;
+        }
+      }
+      (descriptor.seed || []).forEach(([row, value]) => {
+        values[row] = value;
+      });
+      return values;
+    }
+  };
+
+  // Derives every described column once, as Float64Arrays with NaN for
+  // missing samples. ``base`` holds the raw columns the descriptors name.
+  const deriveColumns = (descriptors, base, times) => {
+    const samples = {};
+    Object.keys(base).forEach((name) => {
+      samples[name] = toSamples(base[name]);
+    });
+    // Windows are matched on the naive wall-clock times the builder used, so
+    // parse them as UTC to keep DST shifts out of the arithmetic.
+    let wallClock = null;
+    const columns = {};
+    Object.keys(descriptors).forEach((name) => {
+      const descriptor = descriptors[name];
+      if (descriptor.kind === 'tendency' && !wallClock) {
+        wallClock = new Float64Array(times.length);
+        times.forEach((value, i) => {
+          wallClock[i] = Date.parse(`${value}Z`);
+        });
+      }
+      columns[name] = DERIVATIONS[descriptor.kind](samples[descriptor.base], descriptor, wallClock);
+    });
+    return columns;
+  };
+
+  const loadJson = (url, init) =>
+    fetch(url, init).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to load ${url}: ${response.status}`);
+      }
+      return response.json();
+    });
+
+  // Standalone pages built with --derive fetch the storm's time axis and base
+  // columns from one shared file; resolves to { times, columns }, or null.
+  const loadDerivedColumns = (figure) => {
+    const derived = figure.derived;
+    if (!derived) {
+      return Promise.resolve(null);
+    }
+    return loadJson(derived.url).then((base) => ({
+      times: base.times,
+      columns: deriveColumns(derived.columns, base.columns, base.times)
+    }));
+  };
+
+  const customdataRows = (length, extras) =>
+    Array.from({ length }, (_, row) =>
+      extras.map((values) => {
+        const value = values[row];
+        return typeof value === 'number' && Number.isNaN(value) ? null : value;
+      })
+    );
+
+  // Fills in the y and customdata arrays the builder left out because the
+  // runtime derives them.
+  const withDerivedColumns = (figure, derived, data) => {
+    if (!derived) {
+      return data;
+    }
+    const columns = derived.columns;
+    return data.map((trace, index) => {
+      const source = figure.derived.sources[index];
+      const filled = {};
+      if (!trace.y && columns[source.y]) {
+        filled.y = columns[source.y];
+      }
+      const extras = (source.customdata || []).map((name) => columns[name]);
+      if (!trace.customdata && extras.length && extras.every(Boolean)) {
+        filled.customdata = customdataRows(trace.x.length, extras);
+      }
+      return Object.keys(filled).length ? Object.assign({}, trace, filled) : trace;
+    });
+  };
+
+  let webglSupport = null;
+  const supportsWebGL = () => {
+    if (webglSupport === null) {
+      try {
+        const canvas = document.createElement('canvas');
+        webglSupport = Boolean(
+          global.WebGLRenderingContext &&
+            (canvas.getContext('webgl') || canvas.getContext('experimental-webgl'))
+        );
+      } catch (err) {
+        webglSupport = false;
+      }
+    }
+    return webglSupport;
+  };
+
+  // Dense traces are emitted as scattergl; draw them as SVG where WebGL is
+  // unavailable so the chart still renders (just more slowly).
+  const withRenderableTraces = (data) => {
+    if (supportsWebGL() || !data.some((trace) => trace.type === 'scattergl')) {
+      return data;
+    }
+    return data.map((trace) =>
+      trace.type === 'scattergl' ? Object.assign({}, trace, { type: 'scatter' }) : trace
+    );
+  };
+
+  const PERF_PREFIX = 'wxchart:';
+  const PERF_SAMPLE_LIMIT = 2000;
+  const PERF_OVERLAY_INTERVAL_MS = 250;
+  const hasUserTiming = () =>
+    typeof performance !== 'undefined' && typeof performance.mark === 'function';
+
+  const percentile = (sorted, fraction) => {
+    if (!sorted.length) {
+      return null;
+    }
+    const rank = Math.min(sorted.length - 1, Math.max(0, Math.ceil(fraction * sorted.length) - 1));
+    return Math.round(sorted[rank] * 100) / 100;
+  };
+
+  const summarize = (samples) => {
+    const sorted = samples.slice().sort((a, b) => a - b);
+    return {
+      count: sorted.length,
+      p50: percentile(sorted, 0.5),
+      p90: percentile(sorted, 0.9),
+      p99: percentile(sorted, 0.99),
+      max: sorted.length ? Math.round(sorted[sorted.length - 1] * 100) / 100 : null
+    };
+  };
+
+  // Records User Timing marks for chart start-up and hover latency. Charts
+  // built without --perf get the no-op recorder.
+  const NO_PERF = { enabled: false, mark() {}, hover() {}, ready() {}, report: () => null };
+  const createPerfRecorder = (enabled) => {
+    if (!enabled || !hasUserTiming()) {
+      return NO_PERF;
+    }
+    const marks = {};
+    const startMark = `${PERF_PREFIX}script-start`;
+    const started = performance.getEntriesByName(startMark).length > 0;
+    const latency = [];
+    const apply = [];
+    let overlay = null;
+    let overlayTimer = null;
+    const report = () => ({
+      version: 1,
+      page: typeof location !== 'undefined' ? location.pathname : null,
+      userAgent: typeof navigator !== 'undefined' ? navigator.userAgent : null,
+      marks: Object.assign({}, marks),
+      hover: { latency: summarize(latency), apply: summarize(apply) }
+    });
+    const dump = () => {
+      if (typeof console !== 'undefined') {
+        console.log(`[${PERF_PREFIX}perf] ${JSON.stringify(report())}`);
+      }
+    };
+    const renderOverlay = () => {
+      overlayTimer = null;
+      const current = report();
+      const hover = current.hover.latency;
+      const stages = Object.keys(current.marks)
+        .map((name) => `${name} ${current.marks[name]} ms`)
+        .join(' · ');
+      overlay.textContent =
+        `${stages}\nhover n=${hover.count} p50 ${hover.p50} p90 ${hover.p90} p99 ${hover.p99} ms`;
+    };
+    const scheduleOverlay = () => {
+      if (overlay && overlayTimer === null) {
+        overlayTimer = setTimeout(renderOverlay, PERF_OVERLAY_INTERVAL_MS);
+      }
+    };
+    const showOverlay =
+      typeof URLSearchParams !== 'undefined' &&
+      typeof location !== 'undefined' &&
+      new URLSearchParams(location.search).get('perf') === '1';
+    if (showOverlay && typeof document !== 'undefined') {
+      overlay = document.createElement('pre');
+      overlay.title = 'Click to log a JSON report';
+      Object.assign(overlay.style, {
+        position: 'fixed',
+        top: '0',
+        right: '0',
+        margin: '0',
+        padding: '4px 6px',
+        font: '11px/1.3 monospace',
+        background: 'rgba(0, 0, 0, 0.7)',
+        color: '#fff',
+        zIndex: '10000',
+        whiteSpace: 'pre'
+      });
+      overlay.addEventListener('click', dump);
+      document.body.appendChild(overlay);
+      if (typeof window !== 'undefined') {
+        window.addEventListener('pagehide', dump);
+      }
+    }
+    return {
+      enabled: true,
+      // Marks a start-up stage and measures it from the page's script start.
+      mark(stage) {
+        const name = `${PERF_PREFIX}${stage}`;
+        performance.mark(name);
+        const measure = performance.measure(name, started ? startMark : undefined, name);
+        const duration = measure && typeof measure.duration === 'number'
+          ? measure.duration
+          : performance.now();
+        marks[stage] = Math.round(duration * 10) / 10;
+        scheduleOverlay();
+      },
+      // inputTime: when the first input of the frame arrived; applyStart:
+      // when the frame began updating the chart.
+      hover(inputTime, applyStart) {
+        const end = performance.now();
+        latency.push(end - inputTime);
+        apply.push(end - applyStart);
+        if (latency.length > PERF_SAMPLE_LIMIT) {
+          latency.shift();
+          apply.shift();
+        }
+        scheduleOverlay();
+      },
+      // Called once start-up is complete; ?perf=1 logs the report then.
+      ready() {
+        if (showOverlay) {
+          dump();
+        }
+      },
+      report
+    };
+  };
+
+  const SVG_NS = 'http://www.w3.org/2000/svg';
+  const HIGHLIGHT_RADIUS = 5;
+
+  // Scrub gesture tuning, in CSS pixels and milliseconds.
+  const SCRUB_EDGE_PAD = 4;
+  const DOUBLE_TAP_MS = 300;
+  const DOUBLE_TAP_SLOP = 24;
+  const axisKey = (prefix, ref) => `${prefix}axis${(ref || prefix).slice(1)}`;
+
+  const isTraceShown = (gd, index) => {
+    const full = gd._fullData && gd._fullData[index];
+    const visible = full ? full.visible : gd.data[index].visible;
+    return visible !== false && visible !== 'legendonly';
+  };
+
+  // One absolutely positioned <svg> over the plot holding a marker per line
+  // trace. Moving a marker only touches its own attributes; Plotly never
+  // recalculates or redraws for a hover.
+  // sources: [{ trace, index }] for the line traces that get a marker.
+  const createHighlightLayer = (gd, sources) => {
+    const svg = document.createElementNS(SVG_NS, 'svg');
+    svg.setAttribute('class', 'wxchart-highlights');
+    Object.assign(svg.style, {
+      position: 'absolute',
+      left: '0',
+      top: '0',
+      width: '100%',
+      height: '100%',
+      overflow: 'visible',
+      pointerEvents: 'none'
+    });
+    const markers = sources.map(({ trace, index }) => {
+      const circle = document.createElementNS(SVG_NS, 'circle');
+      circle.setAttribute('r', String(HIGHLIGHT_RADIUS));
+      circle.setAttribute('fill', trace.line && trace.line.color ? trace.line.color : '#1f77b4');
+      circle.setAttribute('stroke', 'rgba(0, 0, 0, 0.85)');
+      circle.setAttribute('stroke-width', '2');
+      circle.style.display = 'none';
+      svg.appendChild(circle);
+      return {
+        circle,
+        index,
+        xaxis: axisKey('x', trace.xaxis),
+        yaxis: axisKey('y', trace.yaxis),
+        state: { visible: false, x: null, y: null },
+        shown: false
+      };
+    });
+    // Sit below Plotly's hover layer so labels stay on top of the markers.
+    const container = (gd.querySelector && gd.querySelector('.svg-container')) || gd;
+    const hoverLayer = gd.querySelector && gd.querySelector('.hoverlayer');
+    const topSvg = hoverLayer ? hoverLayer.ownerSVGElement : null;
+    container.insertBefore(svg, topSvg && topSvg.parentNode === container ? topSvg : null);
+    const place = (marker) => {
+      const fullLayout = gd._fullLayout || {};
+      const xaxis = fullLayout[marker.xaxis];
+      const yaxis = fullLayout[marker.yaxis];
+      const { state } = marker;
+      let show = Boolean(
+        state.visible && xaxis && yaxis && state.y !== null && isTraceShown(gd, marker.index)
+      );
+      if (show) {
+        const px = xaxis.l2p(xaxis.d2l(state.x));
+        const py = yaxis.l2p(yaxis.d2l(state.y));
+        // Hide markers that fall outside their subplot after a zoom.
+        show =
+          Number.isFinite(px) &&
+          Number.isFinite(py) &&
+          px >= 0 &&
+          px <= xaxis._length &&
+          py >= 0 &&
+          py <= yaxis._length;
+        if (show) {
+          marker.circle.setAttribute('cx', String(px + xaxis._offset));
+          marker.circle.setAttribute('cy', String(py + yaxis._offset));
+        }
+      }
+      if (show !== marker.shown) {
+        marker.circle.style.display = show ? '' : 'none';
+        marker.shown = show;
+      }
+    };
+    return {
+      size: markers.length,
+      // states: Map of marker index -> { visible, x, y }; unchanged markers
+      // are left alone.
+      set(states) {
+        states.forEach((state, index) => {
+          const marker = markers[index];
+          const previous = marker.state;
+          if (
+            previous.visible === state.visible &&
+            (!state.visible || (previous.x === state.x && previous.y === state.y))
+          ) {
+            return;
+          }
+          marker.state = state;
+          place(marker);
+        });
+      },
+      hideAll() {
+        markers.forEach((marker) => {
+          if (marker.state.visible) {
+            marker.state = { visible: false, x: marker.state.x, y: marker.state.y };
+            place(marker);
+          }
+        });
+      },
+      // Axis ranges or the plot size changed; re-project the visible markers.
+      reposition() {
+        markers.forEach((marker) => {
+          if (marker.state.visible) {
+            place(marker);
+          }
+        });
+      },
+      remove() {
+        if (svg.parentNode) {
+          svg.parentNode.removeChild(svg);
+        }
+      }
+    };
+  };
+
+  const MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+  const MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+  ];
+  const DAYS = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
+  const pad2 = (value) => (value < 10 ? `0${value}` : String(value));
+
+  // The strftime subset used by the specs' hover formats.
+  const formatTime = (value, format) => {
+    const date = new Date(toTimestamp(value));
+    if (Number.isNaN(date.getTime())) {
+      return String(value);
+    }
+    const hours = date.getHours();
+    return format.replace(/%([a-zA-Z%])/g, (token, code) => {
+      switch (code) {
+        case 'Y': return String(date.getFullYear());
+        case 'y': return pad2(date.getFullYear() % 100);
+        case 'm': return pad2(date.getMonth() + 1);
+        case 'b': return MONTHS[date.getMonth()];
+        case 'B': return MONTH_NAMES[date.getMonth()];
+        case 'a': return DAYS[date.getDay()];
+        case 'd': return pad2(date.getDate());
+        case 'e': return String(date.getDate());
+        case 'H': return pad2(hours);
+        case 'I': return pad2(hours % 12 || 12);
+        case 'M': return pad2(date.getMinutes());
+        case 'S': return pad2(date.getSeconds());
+        case 'p': return hours < 12 ? 'AM' : 'PM';
+        case '%': return '%';
+        default: return token;
+      }
+    });
+  };
+
+  // Hover formats are d3-style (":.1f"); anything else prints the value
+  // rounded to three decimals.
+  const formatValue = (value, format, unit) => {
+    if (value === null || value === undefined || Number.isNaN(value)) {
+      return '–';
+    }
+    const fixed = /^:?\.(\d+)f$/.exec(format || '');
+    const text = fixed
+      ? Number(value).toFixed(Number(fixed[1]))
+      : String(Math.round(value * 1000) / 1000);
+    return unit ? `${text} ${unit}` : text;
+  };
+
+  // A unified tooltip drawn into one reused node, filled from the label and
+  // format metadata the builder emits. Used for touch and synced hover so a
+  // scrub frame only rewrites a few text nodes.
+  const createScrubTooltip = (gd, meta, sources) => {
+    const container = (gd.querySelector && gd.querySelector('.svg-container')) || gd;
+    const box = document.createElement('div');
+    box.className = 'wxchart-tooltip';
+    Object.assign(box.style, {
+      position: 'absolute',
+      top: '0',
+      left: '0',
+      display: 'none',
+      padding: '4px 6px',
+      background: '#f0f0f0',
+      border: '1px solid #444',
+      font: '12px/1.35 sans-serif',
+      color: '#222',
+      whiteSpace: 'pre',
+      pointerEvents: 'none',
+      zIndex: '1'
+    });
+    const header = document.createElement('div');
+    header.style.fontWeight = '600';
+    box.appendChild(header);
+    const rows = sources.map(({ trace, index }) => {
+      const row = document.createElement('div');
+      const swatch = document.createElement('span');
+      Object.assign(swatch.style, {
+        display: 'inline-block',
+        width: '8px',
+        height: '8px',
+        marginRight: '4px',
+        background: trace.line && trace.line.color ? trace.line.color : '#1f77b4'
+      });
+      const text = document.createElement('span');
+      row.appendChild(swatch);
+      row.appendChild(text);
+      box.appendChild(row);
+      const series = (meta && meta.series && meta.series[index]) || {};
+      return { row, text, trace, index, series, shown: true, content: null };
+    });
+    container.appendChild(box);
+    const timeFormat = (meta && meta.time_format) || '%b %d, %I:%M %p';
+    let visible = false;
+    return {
+      // matches: Map of row index -> { x, y, index } for the rows to show.
+      show(matches) {
+        let anchor = null;
+        rows.forEach((entry, rowIndex) => {
+          const match = matches.get(rowIndex);
+          const shown = Boolean(match);
+          if (shown !== entry.shown) {
+            entry.row.style.display = shown ? '' : 'none';
+            entry.shown = shown;
+          }
+          if (!match) {
+            return;
+          }
+          anchor = anchor || { match, trace: entry.trace };
+          const { series, trace } = entry;
+          // Pyramid refinement restyles the trace, so read the live customdata.
+          const customdata = (gd.data[entry.index] || trace).customdata;
+          const lines = [
+            `${series.label || trace.name || ''}: ${formatValue(match.y, series.format, series.unit)}`
+          ];
+          (series.extras || []).forEach((extra, k) => {
+            const row = customdata ? customdata[match.index] : null;
+            lines.push(`${extra.label}: ${formatValue(row ? row[k] : null, extra.format, extra.unit)}`);
+          });
+          const content = lines.join('\n');
+          if (content !== entry.content) {
+            entry.text.textContent = content;
+            entry.content = content;
+          }
+        });
+        const fullLayout = gd._fullLayout || {};
+        const xaxis = anchor ? fullLayout[axisKey('x', anchor.trace.xaxis)] : null;
+        if (!xaxis) {
+          this.hide();
+          return;
+        }
+        header.textContent = formatTime(anchor.match.x, timeFormat);
+        const px = xaxis._offset + xaxis.l2p(xaxis.d2l(anchor.match.x));
+        if (!(px >= xaxis._offset && px <= xaxis._offset + xaxis._length)) {
+          this.hide();
+          return;
+        }
+        const flip = px > xaxis._offset + xaxis._length / 2;
+        box.style.left = `${px + (flip ? -12 : 12)}px`;
+        box.style.top = `${fullLayout._size ? fullLayout._size.t : 8}px`;
+        box.style.transform = flip ? 'translateX(-100%)' : '';
+        if (!visible) {
+          box.style.display = 'block';
+          visible = true;
+        }
+      },
+      hide() {
+        if (visible) {
+          box.style.display = 'none';
+          visible = false;
+        }
+      },
+      remove() {
+        if (box.parentNode) {
+          box.parentNode.removeChild(box);
+        }
+      }
+    };
+  };
+
+  // Teardown callbacks for listeners a chart registers outside its own div.
+  const disposers = new WeakMap();
+  const onDispose = (gd, dispose) => {
+    if (!disposers.has(gd)) {
+      disposers.set(gd, []);
+    }
+    disposers.get(gd).push(dispose);
+  };
+
+  const perfReports = new WeakMap();
+  let latestPerfReport = null;
+
+  // The current performance report of a chart rendered with options.perf:
+  // WxChart.perfReport() reads the most recently rendered chart's, or pass
+  // the chart's element to pick one. Null when the chart is not instrumented.
+  const perfReport = (gd) => {
+    const report = gd === undefined ? latestPerfReport : perfReports.get(gd);
+    return report ? report() : null;
+  };
+
+  function unmount(gd) {
+    (disposers.get(gd) || []).forEach((dispose) => dispose());
+    disposers.delete(gd);
+    Plotly.purge(gd);
+  }
+
+  function render(target, figure, config, options) {
+    const settings = options || {};
+    const pyramid = settings.pyramid || null;
+    const live = settings.live || null;
+    const perf = createPerfRecorder(Boolean(settings.perf));
+    const plotted = loadDerivedColumns(figure).then((derived) =>
+      Plotly.newPlot(
+        target,
+        withRenderableTraces(
+          withDerivedColumns(
+            figure,
+            derived,
+            withSharedTimes(figure, derived ? derived.times : figure.times)
+          )
+        ),
+        figure.layout,
+        config
+      )
+    );
+    return plotted.then((gd) => {
+      perf.mark('newplot');
+      if (perf.enabled) {
+        perfReports.set(gd, perf.report);
+        latestPerfReport = perf.report;
+      }
+      let disposed = false;
+      onDispose(gd, () => {
+        disposed = true;
+      });
+      const captureInitialView = () => {
+        const fullLayout = gd._fullLayout;
+        if (!fullLayout) {
+          return {};
+        }
+        const state = {};
+        Object.keys(fullLayout).forEach((key) => {
+          if (!key.startsWith('xaxis') && !key.startsWith('yaxis')) {
+            return;
+          }
+          const axis = fullLayout[key];
+          if (!axis || typeof axis !== 'object') {
+            return;
+          }
+          if (axis.autorange) {
+            state[`${key}.autorange`] = true;
+          } else if (Array.isArray(axis.range)) {
+            state[`${key}.range`] = axis.range.slice();
+          } else if (Array.isArray(axis._range)) {
+            state[`${key}.range`] = axis._range.slice();
+          }
+        });
+        return state;
+      };
+      let initialViewState = captureInitialView();
+      const ensureInitialViewState = () => {
+        if (!initialViewState || !Object.keys(initialViewState).length) {
+          initialViewState = captureInitialView();
+        }
+      };
+      const resetToInitialView = () => {
+        ensureInitialViewState();
+        const relayoutUpdate = {};
+        Object.keys(initialViewState || {}).forEach((key) => {
+          const value = initialViewState[key];
+          relayoutUpdate[key] = Array.isArray(value) ? value.slice() : value;
+        });
+        if (Object.keys(relayoutUpdate).length) {
+          Plotly.relayout(gd, relayoutUpdate);
+        }
+      };
+      const clearHoverTitles = () => {
+        const fullLayout = gd._fullLayout;
+        if (!fullLayout) {
+          return;
+        }
+        Object.keys(fullLayout).forEach((key) => {
+          if (!key.startsWith('xaxis')) {
+            return;
+          }
+          const axis = fullLayout[key];
+          if (axis && typeof axis === 'object') {
+            axis._hovertitle = '';
+          }
+        });
+      };
+      clearHoverTitles();
+      ensureInitialViewState();
+      gd.on('plotly_afterplot', ensureInitialViewState);
+      gd.on('plotly_afterplot', clearHoverTitles);
+      gd.on('plotly_relayout', clearHoverTitles);
+      gd.on('plotly_restyle', clearHoverTitles);
+      gd.on('plotly_update', clearHoverTitles);
+      const originalCount = gd.data.length;
+      const originalTraces = gd.data.slice(0, originalCount);
+      const highlightIndexMap = new Map();
+      const highlightSources = [];
+      originalTraces.forEach((trace, index) => {
+        if (!LINE_TRACE_TYPES.has(trace.type)) {
+          highlightIndexMap.set(index, null);
+          return;
+        }
+        highlightIndexMap.set(index, highlightSources.length);
+        highlightSources.push({ trace, index });
+      });
+      const highlights = createHighlightLayer(gd, highlightSources);
+      onDispose(gd, highlights.remove);
+      const tooltip = createScrubTooltip(gd, figure.tooltip, highlightSources);
+      onDispose(gd, tooltip.remove);
+      const repositionHighlights = () => highlights.reposition();
+      gd.on('plotly_afterplot', repositionHighlights);
+      gd.on('plotly_relayouting', repositionHighlights);
+      function makeLookup(trace, curveNumber, index) {
+        const subplot = (trace.xaxis || 'x') + (trace.yaxis || 'y');
+        return {
+          times: index.times,
+          valid: index.valid,
+          count: index.count,
+          x: trace.x,
+          y: trace.y,
+          curveNumber,
+          subplot
+        };
+      }
+      // Hover stays on Plotly's built-in labels until the indexes arrive.
+      const dataLookup = originalTraces.map(() => null);
+      function indexTraces(indices) {
+        const usable = indices.filter((index) => gd.data[index].x && gd.data[index].y);
+        return computeIndexes(usable.map((index) => gd.data[index])).then((results) => {
+          usable.forEach((index, k) => {
+            dataLookup[index] = makeLookup(gd.data[index], index, results[k]);
+          });
+        });
+      }
+      const lookupsReady = indexTraces(originalTraces.map((_, index) => index)).then(() => {
+        perf.mark('index-ready');
+        perf.ready();
+      });
+      function setupPyramid() {
+        if (!pyramid) {
+          return;
+        }
+        const jsonRequests = new Map();
+        const fetchJson = (url) => {
+          if (!jsonRequests.has(url)) {
+            jsonRequests.set(url, loadJson(url));
+          }
+          return jsonRequests.get(url);
+        };
+        const pyramidBase = pyramid.manifest.slice(0, pyramid.manifest.lastIndexOf('/') + 1);
+        let manifestRequest = null;
+        const loadManifest = () => {
+          if (!manifestRequest) {
+            manifestRequest = fetchJson(pyramid.manifest).then((manifest) => {
+              manifest.levels.forEach((level) => {
+                level.chunks.forEach((chunk) => {
+                  chunk.startTime = toTimestamp(chunk.start);
+                  chunk.endTime = toTimestamp(chunk.end);
+                });
+                const chunks = level.chunks;
+                level.startTime = chunks.length ? chunks[0].startTime : NaN;
+                level.endTime = chunks.length ? chunks[chunks.length - 1].endTime : NaN;
+              });
+              return manifest;
+            });
+          }
+          return manifestRequest;
+        };
+        const coarseTraces = originalTraces.map((trace) => ({
+          x: trace.x,
+          y: trace.y,
+          customdata: trace.customdata || null
+        }));
+        const axisGroups = new Map();
+        originalTraces.forEach((trace, index) => {
+          if (!pyramid.sources[index]) {
+            return;
+          }
+          const ref = trace.xaxis || 'x';
+          if (!axisGroups.has(ref)) {
+            axisGroups.set(ref, []);
+          }
+          axisGroups.get(ref).push(index);
+        });
+        const axisLayoutKey = (ref) => (ref === 'x' ? 'xaxis' : `xaxis${ref.slice(1)}`);
+        const chooseLevel = (manifest, start, end) => {
+          let chosen = manifest.levels[0];
+          manifest.levels.forEach((level) => {
+            const span = level.endTime - level.startTime;
+            const fraction = span > 0 ? Math.min(1, Math.max(0, (end - start) / span)) : 1;
+            if (level.points * fraction <= pyramid.budget) {
+              chosen = level;
+            }
+          });
+          return chosen;
+        };
+        const loadRange = (manifest, level, start, end, names) => {
+          const chunks = level.chunks.filter(
+            (chunk) => chunk.endTime >= start && chunk.startTime <= end
+          );
+          const requests = chunks.map((chunk) => {
+            const base = `${pyramidBase}${chunk.path}/`;
+            return Promise.all([
+              fetchJson(`${base}times.json`),
+              ...names.map((name) => fetchJson(`${base}${manifest.columns[name]}.json`))
+            ]);
+          });
+          return Promise.all(requests).then((parts) => {
+            const detail = { times: [], columns: {} };
+            names.forEach((name) => {
+              detail.columns[name] = [];
+            });
+            parts.forEach(([times, ...values]) => {
+              times.forEach((time) => detail.times.push(time));
+              names.forEach((name, idx) => {
+                const target = detail.columns[name];
+                values[idx].forEach((value) => target.push(value));
+              });
+            });
+            detail.startTime = detail.times.length ? toTimestamp(detail.times[0]) : NaN;
+            detail.endTime = detail.times.length
+              ? toTimestamp(detail.times[detail.times.length - 1])
+              : NaN;
+            return detail;
+          });
+        };
+        const spliceTrace = (index, detail) => {
+          const coarse = coarseTraces[index];
+          const source = pyramid.sources[index];
+          const extras = source.customdata || [];
+          const next = { x: [], y: [], customdata: extras.length ? [] : null };
+          const pushCoarse = (i) => {
+            next.x.push(coarse.x[i]);
+            next.y.push(coarse.y[i]);
+            if (next.customdata) {
+              next.customdata.push(coarse.customdata ? coarse.customdata[i] : null);
+            }
+          };
+          let i = 0;
+          while (i < coarse.x.length && toTimestamp(coarse.x[i]) < detail.startTime) {
+            pushCoarse(i);
+            i += 1;
+          }
+          detail.times.forEach((time, j) => {
+            next.x.push(time);
+            next.y.push(detail.columns[source.y][j]);
+            if (next.customdata) {
+              next.customdata.push(extras.map((name) => detail.columns[name][j]));
+            }
+          });
+          while (i < coarse.x.length && toTimestamp(coarse.x[i]) <= detail.endTime) {
+            i += 1;
+          }
+          for (; i < coarse.x.length; i += 1) {
+            pushCoarse(i);
+          }
+          return next;
+        };
+        const activeViews = new Map();
+        let refineToken = 0;
+        const refine = () => {
+          const token = refineToken + 1;
+          refineToken = token;
+          loadManifest()
+            .then((manifest) => {
+              const jobs = [];
+              axisGroups.forEach((indices, ref) => {
+                const axis = gd._fullLayout ? gd._fullLayout[axisLayoutKey(ref)] : null;
+                const range = axis ? axis.range || axis._range : null;
+                if (!range || range.length < 2) {
+                  return;
+                }
+                const start = toTimestamp(range[0]);
+                const end = toTimestamp(range[1]);
+                if (!Number.isFinite(start) || !Number.isFinite(end)) {
+                  return;
+                }
+                const level = chooseLevel(manifest, start, end);
+                const view = level.level === 0 ? 'coarse' : `${level.level}:${start}:${end}`;
+                if ((activeViews.get(ref) || 'coarse') === view) {
+                  return;
+                }
+                if (level.level === 0) {
+                  jobs.push(Promise.resolve({ ref, indices, view, detail: null }));
+                  return;
+                }
+                const names = [];
+                indices.forEach((index) => {
+                  const source = pyramid.sources[index];
+                  [source.y, ...(source.customdata || [])].forEach((name) => {
+                    if (!names.includes(name)) {
+                      names.push(name);
+                    }
+                  });
+                });
+                jobs.push(
+                  loadRange(manifest, level, start, end, names).then((detail) => ({
+                    ref,
+                    indices,
+                    view,
+                    detail
+                  }))
+                );
+              });
+              return Promise.all(jobs);
+            })
+            .then((results) => {
+              if (token !== refineToken || disposed) {
+                return;
+              }
+              results.forEach(({ ref, indices, view, detail }) => {
+                const update = { x: [], y: [], customdata: [] };
+                let sharedX = null;
+                indices.forEach((index) => {
+                  const next = detail && detail.times.length ? spliceTrace(index, detail) : coarseTraces[index];
+                  // Every trace on an axis carries the same times; share one array
+                  // so the hover time index is built once for the group.
+                  sharedX = sharedX || next.x;
+                  update.x.push(sharedX);
+                  update.y.push(next.y);
+                  update.customdata.push(next.customdata);
+                });
+                activeViews.set(ref, view);
+                Plotly.restyle(gd, update, indices)
+                  .then(() => indexTraces(indices))
+                  .then(reapplyCurrentHover);
+              });
+            })
+            .catch((err) => {
+              if (typeof console !== 'undefined') {
+                console.warn('Detail data unavailable', err);
+              }
+            });
+        };
+        gd.on('plotly_relayout', (event) => {
+          if (Object.keys(event || {}).some((key) => key.startsWith('xaxis'))) {
+            refine();
+          }
+        });
+      }
+      setupPyramid();
+      let applyingPeerRange = false;
+      const sync = createSyncChannel(settings.sync || syncGroupFromLocation(), (kind, payload) =>
+        handlePeerMessage(kind, payload)
+      );
+      if (sync) {
+        onDispose(gd, sync.dispose);
+      }
+      let suppressSyntheticHover = false;
+      let pendingHoverState = null;
+      let currentHoverTargetTime = null;
+      let hasActiveHover = false;
+      let frameTargetTime = null;
+      let frameOrigin = 'mouse';
+      let frameRequested = false;
+      let currentHoverOrigin = 'mouse';
+      let plotlyHoverShown = false;
+      function hideHighlights() {
+        highlights.hideAll();
+        tooltip.hide();
+        frameTargetTime = null;
+        hasActiveHover = false;
+        currentHoverTargetTime = null;
+      }
+      // Pointer input can arrive several times per frame; only the latest
+      // target of each frame is applied. origin is 'mouse', 'touch' or
+      // 'peer'; only mouse hover goes through Plotly's hover labels.
+      function scheduleHover(targetTime, origin) {
+        frameTargetTime = targetTime;
+        frameOrigin = origin || 'mouse';
+        if (frameRequested) {
+          return;
+        }
+        frameRequested = true;
+        const inputTime = perf.enabled ? performance.now() : 0;
+        requestAnimationFrame(() => {
+          frameRequested = false;
+          const nextTime = frameTargetTime;
+          const nextOrigin = frameOrigin;
+          frameTargetTime = null;
+          if (disposed) {
+            return;
+          }
+          if (nextTime !== null && Number.isFinite(nextTime)) {
+            const applyStart = perf.enabled ? performance.now() : 0;
+            applyHoverForTime(nextTime, nextOrigin);
+            if (perf.enabled) {
+              perf.hover(inputTime, applyStart);
+            }
+            if (sync && nextOrigin !== 'peer') {
+              sync.publish('hover', nextTime);
+            }
+          }
+        });
+      }
+      function clearHover() {
+        pendingHoverState = null;
+        hideHighlights();
+        Plotly.Fx.unhover(gd);
+        if (sync) {
+          sync.publish('hover', null);
+        }
+      }
+      function findMatch(lookup, targetTime) {
+        const index = nearestValidIndex(lookup.times, lookup.valid, targetTime);
+        if (index < 0) {
+          return null;
+        }
+        return {
+          x: lookup.x[index],
+          y: lookup.y[index],
+          index,
+          curveNumber: lookup.curveNumber,
+          subplot: lookup.subplot
+        };
+      }
+      function queuePendingHover(points, isUserEvent) {
+        if (!isUserEvent) {
+          return;
+        }
+        if (!points || !points.length) {
+          pendingHoverState = { hasPoints: false };
+          return;
+        }
+        const targetTime = toTimestamp(points[0].x);
+        if (!Number.isFinite(targetTime)) {
+          pendingHoverState = { hasPoints: false };
+          return;
+        }
+        pendingHoverState = { hasPoints: true, targetTime };
+      }
+      function flushPendingHover() {
+        if (!pendingHoverState) {
+          return;
+        }
+        const state = pendingHoverState;
+        pendingHoverState = null;
+        if (!state.hasPoints) {
+          hideHighlights();
+          Plotly.Fx.unhover(gd);
+          return;
+        }
+        scheduleHover(state.targetTime);
+      }
+      function applyHoverForTime(targetTime, origin) {
+        const hoverOrigin = origin || 'mouse';
+        const hoverPoints = [];
+        const states = new Map();
+        const matches = new Map();
+        highlightIndexMap.forEach((highlightIdx, sourceIdx) => {
+          if (highlightIdx === null) {
+            return;
+          }
+          const lookup = isTraceShown(gd, sourceIdx) ? dataLookup[sourceIdx] : null;
+          const match = lookup && lookup.count ? findMatch(lookup, targetTime) : null;
+          if (!match) {
+            states.set(highlightIdx, { visible: false, x: null, y: null });
+            return;
+          }
+          states.set(highlightIdx, { visible: true, x: match.x, y: match.y });
+          matches.set(highlightIdx, match);
+          hoverPoints.push({ curveNumber: match.curveNumber, pointNumber: match.index, subplot: match.subplot });
+        });
+        highlights.set(states);
+        const uniquePoints = hoverPoints.filter((point, idx, arr) =>
+          arr.findIndex(
+            (p) =>
+              p.curveNumber === point.curveNumber &&
+              p.pointNumber === point.pointNumber &&
+              p.subplot === point.subplot
+          ) === idx
+        );
+        hasActiveHover = uniquePoints.length > 0;
+        currentHoverTargetTime = hasActiveHover ? targetTime : null;
+        currentHoverOrigin = hoverOrigin;
+        if (hoverOrigin !== 'mouse') {
+          if (matches.size) {
+            tooltip.show(matches);
+          } else {
+            tooltip.hide();
+          }
+          if (plotlyHoverShown) {
+            plotlyHoverShown = false;
+            Plotly.Fx.unhover(gd);
+          }
+          return;
+        }
+        tooltip.hide();
+        plotlyHoverShown = uniquePoints.length > 0;
+        suppressSyntheticHover = true;
+        if (uniquePoints.length) {
+          Plotly.Fx.hover(gd, uniquePoints);
+        } else {
+          Plotly.Fx.unhover(gd);
+        }
+        setTimeout(() => {
+          suppressSyntheticHover = false;
+          flushPendingHover();
+        }, 0);
+      }
+      function reapplyCurrentHover() {
+        if (!hasActiveHover || currentHoverTargetTime === null) {
+          return;
+        }
+        applyHoverForTime(currentHoverTargetTime, currentHoverOrigin);
+      }
+      function xAxisKeys() {
+        return Object.keys(gd._fullLayout || {}).filter((key) => /^xaxis\d*$/.test(key));
+      }
+      function applyPeerRange(range) {
+        const update = {};
+        xAxisKeys().forEach((key) => {
+          const axis = gd._fullLayout[key];
+          if (range === null) {
+            if (!axis.autorange) {
+              update[`${key}.autorange`] = true;
+            }
+          } else if (
+            !Array.isArray(axis.range) ||
+            toTimestamp(axis.range[0]) !== toTimestamp(range[0]) ||
+            toTimestamp(axis.range[1]) !== toTimestamp(range[1])
+          ) {
+            update[`${key}.range`] = range.slice();
+          }
+        });
+        if (!Object.keys(update).length) {
+          return;
+        }
+        applyingPeerRange = true;
+        Plotly.relayout(gd, update).then(
+          () => {
+            applyingPeerRange = false;
+          },
+          () => {
+            applyingPeerRange = false;
+          }
+        );
+      }
+      // Appends rows to a trace's hover index without re-parsing the rows it
+      // already holds. Backing buffers grow geometrically and the lookup
+      // sees views of the used length.
+      function extendLookup(index, stamps, values) {
+        const lookup = dataLookup[index];
+        if (!lookup) {
+          return;
+        }
+        const used = lookup.times.length;
+        const needed = used + stamps.length;
+        if (!lookup.capacity || needed > lookup.capacity) {
+          const capacity = Math.max(needed, used * 2);
+          const times = new Float64Array(capacity);
+          const valid = new Uint8Array(capacity);
+          times.set(lookup.times);
+          valid.set(lookup.valid);
+          lookup.timeBuffer = times;
+          lookup.validBuffer = valid;
+          lookup.capacity = capacity;
+        }
+        for (let k = 0; k < stamps.length; k += 1) {
+          const value = values[k];
+          const isValid =
+            value !== null && !Number.isNaN(value) && Number.isFinite(stamps[k]) ? 1 : 0;
+          lookup.timeBuffer[used + k] = stamps[k];
+          lookup.validBuffer[used + k] = isValid;
+          lookup.count += isValid;
+        }
+        lookup.times = lookup.timeBuffer.subarray(0, needed);
+        lookup.valid = lookup.validBuffer.subarray(0, needed);
+        // extendTraces replaces the trace arrays rather than growing them.
+        lookup.x = gd.data[index].x;
+        lookup.y = gd.data[index].y;
+      }
+      // Live mode polls the build's tail-window delta file and appends the
+      // rows newer than the chart's last sample. Polls that bring nothing
+      // new back off exponentially; new rows reset the interval.
+      function setupLive() {
+        if (!live || disposed) {
+          return;
+        }
+        const times = gd.data[0] && gd.data[0].x ? gd.data[0].x : [];
+        let lastTime = times.length ? toTimestamp(times[times.length - 1]) : NaN;
+        let delay = live.interval;
+        let timer = null;
+        const extend = (indices, update) =>
+          indices.length ? Plotly.extendTraces(gd, update, indices) : Promise.resolve();
+        const appendDelta = (delta) => {
+          const stamps = delta.times.map(toTimestamp);
+          let start = 0;
+          while (
+            start < stamps.length &&
+            Number.isFinite(lastTime) &&
+            !(stamps[start] > lastTime)
+          ) {
+            start += 1;
+          }
+          if (start >= stamps.length) {
+            return false;
+          }
+          // When the window no longer reaches back to the chart's last
+          // sample, rows were missed: a null point breaks the lines there
+          // instead of joining across the gap.
+          const gap = start === 0 && Number.isFinite(lastTime);
+          const x = delta.times.slice(start);
+          const added = stamps.slice(start);
+          if (gap) {
+            x.unshift(x[0]);
+            added.unshift(added[0]);
+          }
+          const plain = { indices: [], update: { x: [], y: [] } };
+          const detailed = { indices: [], update: { x: [], y: [], customdata: [] } };
+          const appended = [];
+          delta.traces.slice(0, originalCount).forEach((entry, index) => {
+            // Typed arrays would store null as 0.
+            const missing = ArrayBuffer.isView(gd.data[index].y) ? NaN : null;
+            const y = entry.y.slice(start).map((value) => (value === null ? missing : value));
+            if (gap) {
+              y.unshift(missing);
+            }
+            const group = entry.customdata && gd.data[index].customdata ? detailed : plain;
+            group.indices.push(index);
+            group.update.x.push(x);
+            group.update.y.push(y);
+            if (group === detailed) {
+              const rows = entry.customdata.slice(start);
+              if (gap) {
+                rows.unshift(rows[0].map(() => null));
+              }
+              group.update.customdata.push(rows);
+            }
+            appended.push([index, y]);
+          });
+          lastTime = stamps[stamps.length - 1];
+          return extend(plain.indices, plain.update)
+            .then(() => extend(detailed.indices, detailed.update))
+            .then(() => {
+              appended.forEach(([index, y]) => extendLookup(index, added, y));
+              reapplyCurrentHover();
+              return true;
+            });
+        };
+        const schedule = () => {
+          if (!disposed) {
+            timer = setTimeout(poll, delay);
+          }
+        };
+        const poll = () => {
+          timer = null;
+          // Hidden pages skip the request but keep backing off.
+          const request =
+            typeof document !== 'undefined' && document.hidden
+              ? Promise.resolve(false)
+              : loadJson(live.delta, { cache: 'no-cache' }).then((delta) =>
+                  disposed ? false : appendDelta(delta)
+                );
+          request
+            .catch(() => false)
+            .then((grew) => {
+              delay = grew ? live.interval : Math.min(delay * 2, live.max_interval);
+              schedule();
+            });
+        };
+        onDispose(gd, () => {
+          if (timer) {
+            clearTimeout(timer);
+          }
+        });
+        schedule();
+      }
+      function setupSync() {
+        if (!sync) {
+          return;
+        }
+        // Only the axis that moved is published; every panel on the page
+        // shares the same time span, so peers apply it to all of theirs.
+        const publishRange = (event) => {
+          if (applyingPeerRange) {
+            return;
+          }
+          const changed = Object.keys(event || {})
+            .map((key) => /^(xaxis\d*)\./.exec(key))
+            .find(Boolean);
+          const axis = changed && gd._fullLayout && gd._fullLayout[changed[1]];
+          if (!axis) {
+            return;
+          }
+          sync.publish('range', axis.autorange ? null : axis.range.slice());
+        };
+        gd.on('plotly_relayouting', publishRange);
+        gd.on('plotly_relayout', publishRange);
+      }
+      function handlePeerMessage(kind, payload) {
+        if (kind === 'range') {
+          applyPeerRange(payload);
+        } else if (kind === 'hover') {
+          if (payload === null || !highlights.size) {
+            pendingHoverState = null;
+            hideHighlights();
+            Plotly.Fx.unhover(gd);
+          } else {
+            scheduleHover(payload, 'peer');
+          }
+        }
+      }
+      // Touch and pen scrubbing; mouse input stays with Plotly's own hover.
+      // The chart claims every gesture through touch-action, so the listeners
+      // can be passive. Subplot positions are measured once per gesture and
+      // only re-measured after the page scrolls or the chart re-renders.
+      function setupScrub() {
+        const root = gd;
+        if (
+          typeof window === 'undefined' ||
+          typeof window.PointerEvent !== 'function' ||
+          !root ||
+          typeof root.addEventListener !== 'function'
+        ) {
+          return;
+        }
+        root.style.touchAction = 'none';
+        let activePointerId = null;
+        let activeTarget = null;
+        let targetsStale = false;
+        let lastTap = null;
+        const measureTargets = () => {
+          const fullLayout = gd._fullLayout;
+          if (!fullLayout || !fullLayout._plots) {
+            return [];
+          }
+          const rootRect = root.getBoundingClientRect();
+          return Object.keys(fullLayout._plots)
+            .map((subplot) => {
+              const plot = fullLayout._plots[subplot];
+              if (!plot || !plot.xaxis || !plot.yaxis) {
+                return null;
+              }
+              const { xaxis, yaxis } = plot;
+              if (!(xaxis._length > 0) || !(yaxis._length > 0)) {
+                return null;
+              }
+              return {
+                axis: xaxis,
+                left: rootRect.left + (xaxis._offset || 0),
+                width: xaxis._length,
+                top: rootRect.top + (yaxis._offset || 0),
+                height: yaxis._length
+              };
+            })
+            .filter((entry) => Boolean(entry));
+        };
+        const findTarget = (targets, clientX, clientY) =>
+          targets.find(
+            (entry) =>
+              clientX >= entry.left &&
+              clientX <= entry.left + entry.width &&
+              clientY >= entry.top &&
+              clientY <= entry.top + entry.height
+          ) || null;
+        // The range is read from the live axis so zooming mid-gesture is
+        // respected; only the pixel box comes from the cached measurement.
+        const timeAt = (target, clientX) => {
+          const range = target.axis.range || target.axis._range;
+          if (!range || range.length < 2) {
+            return NaN;
+          }
+          const start = toTimestamp(range[0]);
+          const end = toTimestamp(range[1]);
+          if (!Number.isFinite(start) || !Number.isFinite(end) || start === end) {
+            return NaN;
+          }
+          // Stay clear of the screen edges, where OS back/forward gestures live.
+          const clamped = Math.min(
+            Math.max(clientX, target.left + SCRUB_EDGE_PAD),
+            target.left + target.width - SCRUB_EDGE_PAD
+          );
+          return start + ((clamped - target.left) / target.width) * (end - start);
+        };
+        const scrubTo = (clientX) => {
+          const targetTime = timeAt(activeTarget, clientX);
+          if (Number.isFinite(targetTime)) {
+            scheduleHover(targetTime, 'touch');
+          }
+        };
+        const endScrub = () => {
+          activePointerId = null;
+          activeTarget = null;
+          clearHover();
+        };
+        const isDoubleTap = (event) => {
+          const tap = { time: event.timeStamp, x: event.clientX };
+          const previous = lastTap;
+          lastTap = tap;
+          if (
+            previous &&
+            tap.time - previous.time <= DOUBLE_TAP_MS &&
+            Math.abs(tap.x - previous.x) <= DOUBLE_TAP_SLOP
+          ) {
+            lastTap = null;
+            return true;
+          }
+          return false;
+        };
+        const handlePointerDown = (event) => {
+          if (event.pointerType === 'mouse') {
+            return;
+          }
+          if (!event.isPrimary) {
+            // A second finger means a pinch or pan, not a scrub.
+            if (activePointerId !== null) {
+              endScrub();
+            }
+            return;
+          }
+          if (isDoubleTap(event)) {
+            endScrub();
+            resetToInitialView();
+            return;
+          }
+          const target = findTarget(measureTargets(), event.clientX, event.clientY);
+          if (!target) {
+            return;
+          }
+          activePointerId = event.pointerId;
+          activeTarget = target;
+          targetsStale = false;
+          if (typeof root.setPointerCapture === 'function') {
+            try {
+              root.setPointerCapture(event.pointerId);
+            } catch (err) {
+              // The pointer may already be gone; the gesture still works
+              // while it stays over the chart.
+            }
+          }
+          scrubTo(event.clientX);
+        };
+        const handlePointerMove = (event) => {
+          if (event.pointerId !== activePointerId) {
+            return;
+          }
+          if (targetsStale) {
+            const axis = activeTarget.axis;
+            activeTarget = measureTargets().find((entry) => entry.axis === axis) || activeTarget;
+            targetsStale = false;
+          }
+          // Hover is applied once per frame and the event already carries the
+          // newest coalesced position, so earlier samples are not read.
+          scrubTo(event.clientX);
+        };
+        const handlePointerEnd = (event) => {
+          if (event.pointerId === activePointerId) {
+            endScrub();
+          }
+        };
+        const markTargetsStale = () => {
+          targetsStale = true;
+        };
+        const handleHoverDuringLayoutChange = () => {
+          targetsStale = true;
+          reapplyCurrentHover();
+        };
+        gd.on('plotly_afterplot', markTargetsStale);
+        gd.on('plotly_relayouting', handleHoverDuringLayoutChange);
+        gd.on('plotly_relayout', handleHoverDuringLayoutChange);
+        gd.on('plotly_update', handleHoverDuringLayoutChange);
+        window.addEventListener('resize', markTargetsStale, { passive: true });
+        window.addEventListener('scroll', handleHoverDuringLayoutChange, { passive: true });
+        onDispose(gd, () => {
+          window.removeEventListener('resize', markTargetsStale);
+          window.removeEventListener('scroll', handleHoverDuringLayoutChange);
+        });
+        const passive = { passive: true };
+        root.addEventListener('pointerdown', handlePointerDown, passive);
+        root.addEventListener('pointermove', handlePointerMove, passive);
+        root.addEventListener('pointerup', handlePointerEnd, passive);
+        root.addEventListener('pointercancel', handlePointerEnd, passive);
+        root.addEventListener('lostpointercapture', handlePointerEnd, passive);
+      }
+      lookupsReady.then(() => {
+        if (!highlights.size) {
+          return;
+        }
+        gd.on('plotly_hover', (event) => {
+          if (suppressSyntheticHover) {
+            queuePendingHover(event.points, Boolean(event.event));
+            return;
+          }
+          if (!event.points || !event.points.length) {
+            hideHighlights();
+            return;
+          }
+          const targetTime = toTimestamp(event.points[0].x);
+          if (!Number.isFinite(targetTime)) {
+            hideHighlights();
+            return;
+          }
+          scheduleHover(targetTime);
+        });
+        gd.on('plotly_unhover', (event) => {
+          if (suppressSyntheticHover) {
+            queuePendingHover(null, Boolean(event && event.event));
+            return;
+          }
+          if (event && event.event) {
+            clearHover();
+            return;
+          }
+          pendingHoverState = null;
+          hideHighlights();
+        });
+        setupScrub();
+      });
+      setupSync();
+      lookupsReady.then(setupLive);
+      return gd;
+    });
+  }
+
+  // Rebuilds a dashboard chart's traces from the payload's shared columns.
+  // Every trace gets the payload's single times array as x, so one hover
+  // time index serves all charts.
+  const hydrateChart = (payload, chart) => {
+    if (!chart.customdata) {
+      chart.customdata = chart.sources.map((source) => {
+        const extras = (source.customdata || []).map((name) => payload.columns[name]);
+        if (!extras.length) {
+          return null;
+        }
+        return customdataRows(payload.times.length, extras);
+      });
+    }
+    const data = chart.data.map((trace, index) => {
+      const hydrated = Object.assign({}, trace, { y: payload.columns[chart.sources[index].y] });
+      if (chart.customdata[index]) {
+        hydrated.customdata = chart.customdata[index];
+      }
+      return hydrated;
+    });
+    return { times: payload.times, data, layout: chart.layout, tooltip: chart.tooltip };
+  };
+
+  // Mounts each [data-chart] slot under ``container`` while it is near the
+  // viewport and purges it once it scrolls away.
+  function dashboard(container, url) {
+    const root = typeof container === 'string' ? document.getElementById(container) : container;
+    return loadJson(url)
+      .then((payload) => {
+        if (payload.derived) {
+          Object.assign(
+            payload.columns,
+            deriveColumns(payload.derived.columns, payload.derived.base, payload.times)
+          );
+        }
+        const mounted = new Map();
+        const mountSlot = (slot) => {
+          if (mounted.has(slot)) {
+            return;
+          }
+          const chart = payload.charts[Number(slot.getAttribute('data-chart'))];
+          if (!chart) {
+            return;
+          }
+          mounted.set(
+            slot,
+            render(slot, hydrateChart(payload, chart), chart.config, { pyramid: chart.pyramid })
+          );
+        };
+        if (typeof IntersectionObserver === 'undefined') {
+          root.querySelectorAll('[data-chart]').forEach(mountSlot);
+          return;
+        }
+        const observer = new IntersectionObserver(
+          (entries) => {
+            entries.forEach((entry) => {
+              const slot = entry.target;
+              if (entry.isIntersecting) {
+                mountSlot(slot);
+                return;
+              }
+              const pending = mounted.get(slot);
+              if (!pending) {
+                return;
+              }
+              mounted.delete(slot);
+              observer.unobserve(slot);
+              pending.then((gd) => {
+                unmount(gd);
+                // A fresh node drops the DOM listeners the runtime attached.
+                const fresh = slot.cloneNode(false);
+                slot.replaceWith(fresh);
+                observer.observe(fresh);
+              });
+            });
+          },
+          { rootMargin: '50% 0px' }
+        );
+        root.querySelectorAll('[data-chart]').forEach((slot) => observer.observe(slot));
+      });
+  }
+
+  global.WxChart = { render, unmount, dashboard, perfReport, toTimestamp };
+})(typeof window !== 'undefined' ? window : this);
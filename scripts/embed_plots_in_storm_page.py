@@ -2,11 +2,19 @@
 import argparse
 import html
 import json
+import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+from urllib.parse import quote
 
 MARKER_START = "<!-- DATA-SECTION:START -->"
 MARKER_END = "<!-- DATA-SECTION:END -->"
+POSTER_SUFFIX = ".poster.svg"
+LOADER_SCRIPT = "assets/js/storm-plots.js"
+DASHBOARD_NAME = "dashboard.html"
+DASHBOARD_HEIGHT = 900
+FRAME_HEIGHT = 520
+PRECACHE_MANIFEST_NAME = "precache-manifest.json"
 
 
 def load_spec(path: Path) -> List[dict]:
@@ -29,6 +37,32 @@ def build_plot_group(summary: str, body: str, *, open_default: bool = False, ext
     )
 
 
+def site_url(rel_path: str) -> str:
+    return f"{{{{ '/{rel_path.lstrip('/')}' | relative_url }}}}"
+
+
+def render_lazy_iframe(url: str, height: int, title: str) -> str:
+    """An iframe the loader script points at ``url`` once its group opens."""
+    attrs = f"width=\"100%\" height=\"{height}\" style=\"border:0\" title=\"{title}\""
+    return (
+        f"      <iframe data-storm-plot-src=\"{url}\" {attrs}></iframe>\n"
+        f"      <noscript><iframe src=\"{url}\" {attrs} loading=\"lazy\"></iframe></noscript>"
+    )
+
+
+def preload_urls(public_dir: Path, root: Path = Path()) -> List[str]:
+    """Shared chart scripts listed by the plot build, as site URLs."""
+    manifest_path = root / public_dir.parent / PRECACHE_MANIFEST_NAME
+    if not manifest_path.exists():
+        return []
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    urls: List[str] = []
+    for url in manifest.get("shared", []):
+        target = Path(os.path.normpath(public_dir.parent / url)).as_posix()
+        urls.append(site_url(target))
+    return urls
+
+
 def render_image_group(entry: dict, public_dir: Path) -> str:
     outfile = entry.get("outfile")
     if not outfile:
@@ -37,8 +71,7 @@ def render_image_group(entry: dict, public_dir: Path) -> str:
     summary = html.escape("Multi-Panel Plots")
     alt_text = html.escape(f"Multi-panel plot for {title}")
     image_name = Path(outfile).name
-    rel_path = (public_dir / image_name).as_posix().lstrip("/")
-    image_url = f"{{{{ '/{rel_path}' | relative_url }}}}"
+    image_url = site_url((public_dir / image_name).as_posix())
     body = (
         "      <figure class=\"storm-multi-panels__figure\">\n"
         f"        <img src=\"{image_url}\" alt=\"{alt_text}\" loading=\"lazy\">\n"
@@ -47,36 +80,82 @@ def render_image_group(entry: dict, public_dir: Path) -> str:
     return build_plot_group(summary, body, open_default=True, extra_classes="storm-multi-panels")
 
 
-def render_iframe_group(entry: dict, public_dir: Path) -> str:
+def render_iframe_group(
+    entry: dict, public_dir: Path, *, sync_group: Optional[str] = None, root: Path = Path()
+) -> str:
     outfile = entry.get("outfile")
     if not outfile:
         return ""
     title = entry.get("title") or Path(outfile).stem.replace("_", " ")
     summary = html.escape(title)
     html_name = Path(outfile).with_suffix(".html").name
-    rel_path = (public_dir / html_name).as_posix().lstrip("/")
-    iframe_url = f"{{{{ '/{rel_path}' | relative_url }}}}"
-    body = (
-        f"      <iframe src=\"{iframe_url}\" width=\"100%\" height=\"520\" loading=\"lazy\" style=\"border:0\"></iframe>"
-    )
+    iframe_url = site_url((public_dir / html_name).as_posix())
+    if sync_group:
+        # Charts loaded with the same ?sync= group share hover time and x-range.
+        iframe_url += f"?sync={quote(sync_group, safe='')}"
+    poster_name = Path(outfile).stem + POSTER_SUFFIX
+    if (root / public_dir / poster_name).exists():
+        # The poster stands in for the chart until the reader clicks it; the
+        # loader script then swaps in the iframe. Without JavaScript the link
+        # opens the chart page itself.
+        poster_url = site_url((public_dir / poster_name).as_posix())
+        alt_text = html.escape(f"Preview of the {title} chart")
+        body = (
+            f"      <a class=\"storm-plot-facade\" href=\"{iframe_url}\" data-storm-plot-src=\"{iframe_url}\" data-storm-plot-title=\"{summary}\">\n"
+            f"        <img src=\"{poster_url}\" alt=\"{alt_text}\" loading=\"lazy\" decoding=\"async\">\n"
+            "        <span class=\"storm-plot-facade__hint\">Load interactive chart</span>\n"
+            "      </a>"
+        )
+    else:
+        body = render_lazy_iframe(iframe_url, FRAME_HEIGHT, summary)
     return build_plot_group(summary, body, open_default=False)
 
 
-def render_data_block(spec: List[dict], public_dir: Path) -> str:
+def render_dashboard_group(public_dir: Path) -> str:
+    dashboard_url = site_url((public_dir / DASHBOARD_NAME).as_posix())
+    body = render_lazy_iframe(dashboard_url, DASHBOARD_HEIGHT, "Interactive charts")
+    return build_plot_group(html.escape("Interactive Charts"), body, open_default=False)
+
+
+def render_data_block(
+    spec: List[dict],
+    public_dir: Path,
+    *,
+    sync_group: Optional[str] = None,
+    dashboard: bool = False,
+    root: Path = Path(),
+) -> str:
+    """Render the storm page's data section.
+
+    ``public_dir`` is relative to the site ``root``; it forms the chart URLs
+    and locates posters and the precache manifest on disk.
+    """
     groups: List[str] = []
     for entry in spec:
         if entry.get("type") == "grid" and entry.get("subplots"):
             group = render_image_group(entry, public_dir)
+        elif dashboard:
+            continue
         else:
-            group = render_iframe_group(entry, public_dir)
+            group = render_iframe_group(entry, public_dir, sync_group=sync_group, root=root)
         if group:
             groups.append(group)
+    if dashboard:
+        # One document mounts every chart, so the page embeds it once.
+        groups.append(render_dashboard_group(public_dir))
     content = "\n".join(groups)
     if content:
         content += "\n"
+    preload_attr = ""
+    if "storm-plot-facade" in content or "<iframe" in content:
+        content += f"<script src=\"{site_url(LOADER_SCRIPT)}\" defer></script>\n"
+        # Opening a group warms these so the chart document finds them cached.
+        preloads = preload_urls(public_dir, root)
+        if preloads:
+            preload_attr = f" data-storm-plot-preload=\"{' '.join(preloads)}\""
     return (
         "<h2>Data</h2>\n"
-        "<div class=\"storm-data\">\n"
+        f"<div class=\"storm-data\"{preload_attr}>\n"
         f"{content}"
         "</div>"
     )
@@ -105,17 +184,47 @@ def update_markdown(path: Path, block: str) -> None:
     path.write_text(new_text, encoding="utf-8")
 
 
+def embed_storm(
+    spec: List[dict],
+    storm_md: Path,
+    public_dir: Path,
+    *,
+    sync: bool = False,
+    dashboard: bool = False,
+    root: Path = Path(),
+) -> None:
+    """Write the data section for ``spec`` into the storm's markdown page."""
+    sync_group = storm_md.stem if sync else None
+    block = render_data_block(
+        spec, public_dir, sync_group=sync_group, dashboard=dashboard, root=root
+    )
+    update_markdown(storm_md, block)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Embed Plotly plots into storm markdown page")
     parser.add_argument("--spec", required=True, help="Path to the plot spec JSON")
     parser.add_argument("--storm-md", required=True, help="Path to the storm markdown file")
     parser.add_argument("--public-dir", required=True, help="Directory where plot HTML files are written")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Link the page's charts so hover and zoom follow each other",
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Embed the storm's single-page dashboard instead of one iframe per chart",
+    )
     args = parser.parse_args()
 
-    spec = load_spec(Path(args.spec))
-    public_dir = Path(args.public_dir)
-    block = render_data_block(spec, public_dir)
-    update_markdown(Path(args.storm_md), block)
+    embed_storm(
+        load_spec(Path(args.spec)),
+        Path(args.storm_md),
+        Path(args.public_dir),
+        sync=args.sync,
+        dashboard=args.dashboard,
+    )
 
 
 if __name__ == "__main__":
@@ -467,12 +467,9 @@ def load_notebook(path: str) -> List[str]:
     return lines
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Parse notebook Matplotlib plots into a spec")
-    parser.add_argument("notebook", help="Path to the .ipynb notebook")
-    args = parser.parse_args()
-
-    cell_sources = load_notebook(args.notebook)
+def parse_notebook(path: str) -> List[Dict[str, object]]:
+    """Return the plot spec entries for every figure drawn in the notebook."""
+    cell_sources = load_notebook(path)
     all_specs: List[Dict[str, object]] = []
     known_dataframes: Set[str] = {"df"}
     for source in cell_sources:
@@ -480,7 +477,15 @@ def main() -> None:
         specs = figure_parser.parse()
         all_specs.extend(specs)
         known_dataframes.update(figure_parser.dataframe_names)
-    json.dump(all_specs, fp=os.fdopen(os.dup(1), "w"), indent=2)
+    return all_specs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse notebook Matplotlib plots into a spec")
+    parser.add_argument("notebook", help="Path to the .ipynb notebook")
+    args = parser.parse_args()
+
+    json.dump(parse_notebook(args.notebook), fp=os.fdopen(os.dup(1), "w"), indent=2)
 
 
 if __name__ == "__main__":
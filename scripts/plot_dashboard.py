@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Write a single-document dashboard that mounts every storm chart lazily."""
+from __future__ import annotations
+
+import html
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from plot_derived import base_columns
+from plot_spec_utils import FigureSpec, StormData
+from static_assets import write_if_changed
+
+DASHBOARD_NAME = "dashboard.html"
+DASHBOARD_DATA_NAME = "dashboard.json"
+CHART_HEIGHT = 520
+
+
+def chart_id(spec: FigureSpec) -> str:
+    return Path(spec.outfile).stem
+
+
+def strip_arrays(trace: Dict[str, object]) -> Dict[str, object]:
+    """Drop the per-point arrays the runtime rebuilds from the shared columns."""
+    return {key: value for key, value in trace.items() if key not in {"x", "y", "customdata"}}
+
+
+def dashboard_payload(
+    built: List[Tuple[FigureSpec, Dict[str, object]]],
+    times: List[str],
+    columns: Dict[str, List[Optional[float]]],
+    pyramids: Optional[List[Optional[Dict[str, object]]]] = None,
+    derived: Optional[Dict[str, Dict[str, object]]] = None,
+    data: Optional[StormData] = None,
+) -> Dict[str, object]:
+    used = {
+        name
+        for _, figure in built
+        for source in figure["sources"]
+        for name in [source["y"], *(source.get("customdata") or [])]
+    }
+    charts: List[Dict[str, object]] = []
+    for position, (spec, figure) in enumerate(built):
+        charts.append(
+            {
+                "id": chart_id(spec),
+                "title": spec.title or chart_id(spec).replace("_", " "),
+                "data": [strip_arrays(trace) for trace in figure["data"]],
+                "sources": figure["sources"],
+                "layout": figure["layout"],
+                "tooltip": figure["tooltip"],
+                "config": figure["config"],
+                "pyramid": pyramids[position] if pyramids else None,
+            }
+        )
+    # The runtime recomputes described columns from the raw ones at load.
+    described: Dict[str, Dict[str, object]] = {}
+    if derived and data is not None:
+        described = {name: entry for name, entry in derived.items() if name in used}
+    payload: Dict[str, object] = {
+        "times": times,
+        "columns": {
+            name: values
+            for name, values in columns.items()
+            if name in used and name not in described
+        },
+        "charts": charts,
+    }
+    if described:
+        payload["derived"] = {"base": base_columns([described], data), "columns": described}
+    return payload
+
+
+def write_dashboard(
+    output_dir: Path,
+    payload: Dict[str, object],
+    *,
+    title: str,
+    runtime_url: str,
+    plotly_url: str,
+    plotly_fallback: str = "",
+) -> List[Path]:
+    """Write the dashboard page and its data file; return both paths."""
+    data_path = output_dir / DASHBOARD_DATA_NAME
+    write_if_changed(data_path, json.dumps(payload, separators=(",", ":")))
+    sections = "\n".join(
+        f"    <section class=\"dashboard-chart\" id=\"{html.escape(chart['id'])}\">\n"
+        f"      <h2>{html.escape(chart['title'])}</h2>\n"
+        f"      <div class=\"dashboard-chart__plot\" data-chart=\"{index}\"></div>\n"
+        "    </section>"
+        for index, chart in enumerate(payload["charts"])
+    )
+    page = f"""<!DOCTYPE html>
+<html lang=\"en\">
+<head>
+  <meta charset=\"utf-8\" />
+  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
+  <title>{html.escape(title)}</title>
+  <script src=\"{plotly_url}\"></script>{plotly_fallback}
+  <script src=\"{runtime_url}\"></script>
+  <style>
+    body {{ margin: 0; padding: 0 0.5rem; font-family: sans-serif; }}
+    .dashboard-chart h2 {{ margin: 1rem 0 0.25rem; font-size: 1.1rem; }}
+    .dashboard-chart__plot {{ width: 100%; height: {CHART_HEIGHT}px; }}
+  </style>
+</head>
+<body>
+{sections}
+  <script>
+    WxChart.dashboard(document.body, '{DASHBOARD_DATA_NAME}');
+  </script>
+</body>
+</html>
+"""
+    page_path = output_dir / DASHBOARD_NAME
+    write_if_changed(page_path, page)
+    return [page_path, data_path]
+
+
+__all__ = [
+    "DASHBOARD_DATA_NAME",
+    "DASHBOARD_NAME",
+    "dashboard_payload",
+    "write_dashboard",
+]
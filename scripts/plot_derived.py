@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Describe chart columns the runtime can recompute from the base record."""
+from __future__ import annotations
+
+import json
+import math
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from plot_spec_utils import StormData
+from static_assets import write_if_changed
+
+DERIVED_BASE_NAME = "base-columns.json"
+PRESSURE_COLUMN = "Bar"
+TENDENCY_PATTERN = re.compile(r"^Pressure_Tendency_(\d+)min$")
+TENDENCY_DECIMALS = 1
+
+
+def forward_fill(values: List[Optional[float]]) -> List[Optional[float]]:
+    filled: List[Optional[float]] = []
+    last: Optional[float] = None
+    for value in values:
+        if value is None:
+            filled.append(last)
+        else:
+            last = value
+            filled.append(last)
+    return filled
+
+
+def running_total(values: List[Optional[float]]) -> List[Optional[float]]:
+    totals: List[Optional[float]] = []
+    running: Optional[float] = None
+    for value in values:
+        if value is None:
+            totals.append(running)
+            continue
+        running = (running or 0.0) + value
+        totals.append(running)
+    return totals
+
+
+def round_half_up(value: float, decimals: int) -> float:
+    """Round the way JavaScript's ``Math.round`` does, so both sides agree."""
+    scale = 10 ** decimals
+    return math.floor(value * scale + 0.5) / scale + 0.0
+
+
+def tendency(
+    times: List[str], base: List[Optional[float]], minutes: int, decimals: int
+) -> List[Optional[float]]:
+    """Change in ``base`` over the preceding ``minutes``, matched by timestamp."""
+    stamps = [datetime.fromisoformat(value) for value in times]
+    rows = {stamp: row for row, stamp in enumerate(stamps)}
+    window = timedelta(minutes=minutes)
+    values: List[Optional[float]] = []
+    for row, stamp in enumerate(stamps):
+        earlier = rows.get(stamp - window)
+        if earlier is None or base[row] is None or base[earlier] is None:
+            values.append(None)
+        else:
+            values.append(round_half_up(base[row] - base[earlier], decimals))
+    return values
+
+
+def describe_tendency(
+    name: str, values: List[Optional[float]], data: StormData
+) -> Optional[Dict[str, object]]:
+    match = TENDENCY_PATTERN.match(name)
+    base = data.columns.get(PRESSURE_COLUMN)
+    if not match or base is None:
+        return None
+    minutes = int(match.group(1))
+    derived = tendency(data.times, base, minutes, TENDENCY_DECIMALS)
+    # Rows whose window starts before the record were computed upstream from
+    # earlier readings; ship those few values as seeds.
+    seed: List[List[object]] = []
+    for row, (value, expected) in enumerate(zip(values, derived)):
+        if expected is None and value is not None:
+            seed.append([row, value])
+        elif expected != value:
+            return None
+    return {
+        "kind": "tendency",
+        "base": PRESSURE_COLUMN,
+        "minutes": minutes,
+        "decimals": TENDENCY_DECIMALS,
+        "seed": seed,
+    }
+
+
+def describe_accumulation(
+    values: List[Optional[float]], data: StormData
+) -> Optional[Dict[str, object]]:
+    for name, column in data.columns.items():
+        if "accum" not in name.lower():
+            continue
+        if running_total(column) == values:
+            return {"kind": "running_total", "base": name}
+        if forward_fill(column) == values:
+            return {"kind": "forward_fill", "base": name}
+    return None
+
+
+def describe_columns(
+    columns: Dict[str, List[Optional[float]]], data: StormData
+) -> Dict[str, Dict[str, object]]:
+    """Return descriptors for the columns the runtime can derive exactly.
+
+    Anything the runtime cannot reproduce value for value keeps shipping its
+    own array.
+    """
+    by_identity = {id(values): name for name, values in data.columns.items()}
+    descriptors: Dict[str, Dict[str, object]] = {}
+    for name, values in columns.items():
+        source_name = by_identity.get(id(values))
+        descriptor = None
+        if source_name is not None:
+            descriptor = describe_tendency(source_name, values, data)
+        elif "accum" in name.lower():
+            descriptor = describe_accumulation(values, data)
+        if descriptor is not None:
+            descriptors[name] = descriptor
+    bases = {descriptor["base"] for descriptor in descriptors.values()}
+    # Columns that plot a base column as-is point at the shipped copy.
+    for name, values in columns.items():
+        source_name = by_identity.get(id(values))
+        if name not in descriptors and source_name in bases:
+            descriptors[name] = {"kind": "column", "base": source_name}
+    return descriptors
+
+
+def base_columns(
+    descriptors: Iterable[Dict[str, Dict[str, object]]], data: StormData
+) -> Dict[str, List[Optional[float]]]:
+    names = sorted({str(entry["base"]) for group in descriptors for entry in group.values()})
+    return {name: data.columns[name] for name in names}
+
+
+def write_base_columns(
+    output_dir: Path, times: List[str], columns: Dict[str, List[Optional[float]]]
+) -> Path:
+    """Write the time axis and raw columns every derived chart of a storm reads."""
+    path = output_dir / DERIVED_BASE_NAME
+    base = {"times": times, "columns": columns}
+    return write_if_changed(path, json.dumps(base, separators=(",", ":")))
+
+
+__all__ = [
+    "DERIVED_BASE_NAME",
+    "base_columns",
+    "describe_columns",
+    "forward_fill",
+    "running_total",
+    "write_base_columns",
+]
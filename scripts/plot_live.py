@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Write the tail-window delta files that live charts poll for new rows."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from static_assets import write_if_changed
+
+DELTA_SUFFIX = ".delta.json"
+# Three hours of one-minute observations: enough overlap that a reader who
+# polled within the back-off ceiling never misses rows.
+DELTA_WINDOW = 180
+POLL_INTERVAL_MS = 60_000
+MAX_POLL_INTERVAL_MS = 15 * 60_000
+
+
+def delta_path(html_path: Path) -> Path:
+    return html_path.with_name(html_path.stem + DELTA_SUFFIX)
+
+
+def write_delta(path: Path, figure: Dict[str, object], *, window: int = DELTA_WINDOW) -> Path:
+    """Write the last ``window`` rows of every trace next to the chart."""
+    times = figure["times"]
+    start = max(0, len(times) - window)
+    traces: List[Dict[str, object]] = []
+    for trace in figure["data"]:
+        entry: Dict[str, object] = {"y": list(trace["y"][start:])}
+        if trace.get("customdata"):
+            entry["customdata"] = trace["customdata"][start:]
+        traces.append(entry)
+    payload = {"end": times[-1] if times else None, "times": times[start:], "traces": traces}
+    return write_if_changed(path, json.dumps(payload, separators=(",", ":")))
+
+
+def live_options(path: Path) -> Dict[str, object]:
+    return {
+        "delta": path.name,
+        "interval": POLL_INTERVAL_MS,
+        "max_interval": MAX_POLL_INTERVAL_MS,
+    }
+
+
+__all__ = [
+    "DELTA_SUFFIX",
+    "delta_path",
+    "live_options",
+    "write_delta",
+]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Write multi-resolution data pyramids for long storm records."""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from static_assets import write_if_changed
+
+PYRAMID_DIR = "pyramid"
+MANIFEST_NAME = "manifest.json"
+LEVEL_FACTOR = 4
+BASE_LEVEL_POINTS = 2000
+CHUNK_POINTS = 2000
+VIEW_POINT_BUDGET = 4000
+
+
+@dataclass
+class PyramidLevel:
+    level: int
+    bucket: int
+    times: List[str]
+    columns: Dict[str, List[Optional[float]]]
+
+
+def column_slug(name: str, taken: Dict[str, str]) -> str:
+    base = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "column"
+    slug = base
+    suffix = 2
+    while slug in taken.values() or slug == "times":
+        slug = f"{base}_{suffix}"
+        suffix += 1
+    return slug
+
+
+def _bucket_extremes(
+    values: List[Optional[float]], start: int, end: int
+) -> Tuple[Optional[float], Optional[float]]:
+    low_idx: Optional[int] = None
+    high_idx: Optional[int] = None
+    for idx in range(start, end):
+        value = values[idx]
+        if value is None:
+            continue
+        if low_idx is None or value < values[low_idx]:
+            low_idx = idx
+        if high_idx is None or value > values[high_idx]:
+            high_idx = idx
+    if low_idx is None or high_idx is None:
+        return None, None
+    # Keep the extremes in the order they were observed so the coarse line
+    # still rises and falls the way the raw record does.
+    if low_idx <= high_idx:
+        return values[low_idx], values[high_idx]
+    return values[high_idx], values[low_idx]
+
+
+def aggregate_level(
+    times: List[str], columns: Dict[str, List[Optional[float]]], bucket: int
+) -> Tuple[List[str], Dict[str, List[Optional[float]]]]:
+    """Reduce ``bucket`` rows to two samples carrying each column's min and max."""
+    if bucket <= 1:
+        return list(times), {key: list(values) for key, values in columns.items()}
+    level_times: List[str] = []
+    level_columns: Dict[str, List[Optional[float]]] = {key: [] for key in columns}
+    for start in range(0, len(times), bucket):
+        end = min(start + bucket, len(times))
+        if end - start == 1:
+            level_times.append(times[start])
+            for key, values in columns.items():
+                level_columns[key].append(values[start])
+            continue
+        level_times.append(times[start])
+        level_times.append(times[start + (end - start) // 2])
+        for key, values in columns.items():
+            first, second = _bucket_extremes(values, start, end)
+            level_columns[key].append(first)
+            level_columns[key].append(second)
+    return level_times, level_columns
+
+
+def level_points(total: int, bucket: int) -> int:
+    if bucket <= 1:
+        return total
+    return 2 * ((total + bucket - 1) // bucket)
+
+
+def build_levels(
+    times: List[str],
+    columns: Dict[str, List[Optional[float]]],
+    *,
+    base_points: int = BASE_LEVEL_POINTS,
+) -> List[PyramidLevel]:
+    """Return levels ordered from coarsest to full resolution."""
+    buckets = [1]
+    while level_points(len(times), buckets[-1]) > base_points:
+        buckets.append(buckets[-1] * LEVEL_FACTOR)
+    levels: List[PyramidLevel] = []
+    for level, bucket in enumerate(reversed(buckets)):
+        level_times, level_columns = aggregate_level(times, columns, bucket)
+        levels.append(
+            PyramidLevel(level=level, bucket=bucket, times=level_times, columns=level_columns)
+        )
+    return levels
+
+
+def write_json(path: Path, payload: object) -> Path:
+    return write_if_changed(path, json.dumps(payload, separators=(",", ":")))
+
+
+def remove_stale_files(root: Path, keep: Set[Path]) -> None:
+    for path in sorted(root.rglob("*"), reverse=True):
+        if path.is_dir():
+            if not any(path.iterdir()):
+                path.rmdir()
+            continue
+        original = path.with_suffix("") if path.suffix in {".gz", ".br"} else path
+        if original not in keep:
+            path.unlink()
+
+
+def write_pyramid(
+    output_dir: Path,
+    levels: List[PyramidLevel],
+    *,
+    chunk_points: int = CHUNK_POINTS,
+) -> Dict[str, object]:
+    """Write every level as time-range chunks plus a manifest describing them."""
+    root = output_dir / PYRAMID_DIR
+    written: Set[Path] = set()
+    slugs: Dict[str, str] = {}
+    for name in levels[0].columns if levels else []:
+        slugs[name] = column_slug(name, slugs)
+    manifest_levels: List[Dict[str, object]] = []
+    for level in levels:
+        chunks: List[Dict[str, object]] = []
+        for number, start in enumerate(range(0, len(level.times), chunk_points)):
+            end = min(start + chunk_points, len(level.times))
+            chunk_dir = f"L{level.level}/{number:04d}"
+            written.add(write_json(root / chunk_dir / "times.json", level.times[start:end]))
+            for name, values in level.columns.items():
+                written.add(
+                    write_json(root / chunk_dir / f"{slugs[name]}.json", values[start:end])
+                )
+            chunks.append(
+                {
+                    "path": chunk_dir,
+                    "start": level.times[start],
+                    "end": level.times[end - 1],
+                    "points": end - start,
+                }
+            )
+        manifest_levels.append(
+            {
+                "level": level.level,
+                "bucket": level.bucket,
+                "points": len(level.times),
+                "chunks": chunks,
+            }
+        )
+    manifest = {"version": 1, "columns": slugs, "levels": manifest_levels}
+    written.add(write_json(root / MANIFEST_NAME, manifest))
+    remove_stale_files(root, written)
+    return manifest
+
+
+def apply_level(figure: Dict[str, object], level: PyramidLevel) -> None:
+    """Swap a built figure's trace arrays for the values of ``level``."""
+    figure["times"] = level.times
+    for trace, source in zip(figure["data"], figure["sources"]):
+        trace["x"] = level.times
+        trace["y"] = level.columns[source["y"]]
+        extras = source.get("customdata") or []
+        if extras:
+            trace["customdata"] = [
+                [level.columns[name][i] for name in extras] for i in range(len(level.times))
+            ]
+
+
+def collect_columns(figures: List[Dict[str, object]]) -> Dict[str, List[Optional[float]]]:
+    """Merge every figure's source columns, renaming clashes in its sources."""
+    columns: Dict[str, List[Optional[float]]] = {}
+    for figure in figures:
+        renames: Dict[str, str] = {}
+        for name, values in figure["columns"].items():
+            key = name
+            suffix = 2
+            while key in columns and columns[key] != values:
+                key = f"{name} ({suffix})"
+                suffix += 1
+            columns.setdefault(key, values)
+            if key != name:
+                renames[name] = key
+        if not renames:
+            continue
+        figure["columns"] = {renames.get(name, name): values for name, values in figure["columns"].items()}
+        for source in figure["sources"]:
+            source["y"] = renames.get(source["y"], source["y"])
+            if source.get("customdata"):
+                source["customdata"] = [renames.get(name, name) for name in source["customdata"]]
+    return columns
+
+
+def runtime_options(figure: Dict[str, object]) -> Dict[str, object]:
+    return {
+        "manifest": f"{PYRAMID_DIR}/{MANIFEST_NAME}",
+        "budget": VIEW_POINT_BUDGET,
+        "sources": figure["sources"],
+    }
+
+
+__all__ = [
+    "BASE_LEVEL_POINTS",
+    "PYRAMID_DIR",
+    "PyramidLevel",
+    "aggregate_level",
+    "apply_level",
+    "build_levels",
+    "collect_columns",
+    "runtime_options",
+    "write_pyramid",
+]
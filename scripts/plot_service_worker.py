@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Generate the chart service worker and its precache manifest."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from static_assets import (
+    ASSETS_DIR,
+    BUILD_MANIFEST_NAME,
+    HASH_LENGTH,
+    SCRIPTS_DIR,
+    content_hash,
+    relative_url,
+)
+
+SERVICE_WORKER_SOURCE = SCRIPTS_DIR / "plots_service_worker.js"
+SERVICE_WORKER_NAME = "sw.js"
+PRECACHE_MANIFEST_NAME = "precache-manifest.json"
+PLOTS_SUBDIR = "plots"
+SHARED_SUBDIR = "js"
+# Chart documents and their data; posters and panels belong to the storm page.
+CACHED_SUFFIXES = {".html", ".json"}
+VERSION_PLACEHOLDER = "__PRECACHE_VERSION__"
+
+
+def read_artifacts(manifest_dir: Path) -> Dict[str, Dict[str, object]]:
+    path = manifest_dir / BUILD_MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("artifacts", {})
+
+
+def collect_precache(assets_dir: Path = ASSETS_DIR) -> Dict[str, object]:
+    """List every cacheable chart file with its content hash.
+
+    URLs are relative to the plots directory, which is the worker's scope.
+    Shared scripts are precached on install; chart pages and data are cached
+    the first time they are requested.
+    """
+    plots_dir = assets_dir / PLOTS_SUBDIR
+    files: Dict[str, str] = {}
+    shared: List[str] = []
+    shared_dir = assets_dir / SHARED_SUBDIR
+    for name, entry in read_artifacts(shared_dir).items():
+        url = relative_url(shared_dir / name, plots_dir)
+        files[url] = str(entry["sha256"])[:HASH_LENGTH]
+        shared.append(url)
+    for storm_dir in sorted(path for path in plots_dir.iterdir() if path.is_dir()):
+        for name, entry in read_artifacts(storm_dir).items():
+            if Path(name).suffix in CACHED_SUFFIXES:
+                files[relative_url(storm_dir / name, plots_dir)] = str(entry["sha256"])[:HASH_LENGTH]
+    files = {url: files[url] for url in sorted(files)}
+    version = content_hash(json.dumps([shared, files], sort_keys=True).encode("utf-8"))
+    return {"version": version, "shared": sorted(shared), "files": files}
+
+
+def write_service_worker(assets_dir: Path = ASSETS_DIR) -> List[Path]:
+    """Write ``plots/sw.js`` and its precache manifest; return both paths."""
+    plots_dir = assets_dir / PLOTS_SUBDIR
+    plots_dir.mkdir(parents=True, exist_ok=True)
+    manifest = collect_precache(assets_dir)
+    manifest_path = plots_dir / PRECACHE_MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    source = SERVICE_WORKER_SOURCE.read_text(encoding="utf-8")
+    worker_path = plots_dir / SERVICE_WORKER_NAME
+    worker_path.write_text(source.replace(VERSION_PLACEHOLDER, manifest["version"]), encoding="utf-8")
+    return [worker_path, manifest_path]
+
+
+__all__ = [
+    "PLOTS_SUBDIR",
+    "PRECACHE_MANIFEST_NAME",
+    "SERVICE_WORKER_NAME",
+    "collect_precache",
+    "write_service_worker",
+]
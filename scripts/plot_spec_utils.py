@@ -140,6 +140,14 @@ def parse_figure(entry: Dict[str, object]) -> FigureSpec:
     )
 
 
+def figure_columns(spec: FigureSpec) -> List[str]:
+    """CSV columns a figure plots, in the order it names them."""
+    series = list(spec.series or [])
+    for subplot in spec.subplots or []:
+        series.extend(subplot.series)
+    return list(dict.fromkeys(entry.column for entry in series))
+
+
 def load_spec(path: Path) -> List[FigureSpec]:
     with open(path, "r", encoding="utf-8") as f:
         raw = json.load(f)
@@ -202,6 +210,8 @@ __all__ = [
     "SeriesEntry",
     "StormData",
     "SubplotEntry",
+    "figure_columns",
     "load_data",
     "load_spec",
+    "parse_figure",
 ]
@@ -0,0 +1,147 @@
+/* WxManBran chart cache. Generated into assets/plots/sw.js by the plot build;
+ * __PRECACHE_VERSION__ is replaced with the precache manifest's hash so every
+ * rebuild that changes a chart ships a new worker.
+ */
+'use strict';
+
+const PRECACHE_VERSION = '__PRECACHE_VERSION__';
+const MANIFEST_URL = 'precache-manifest.json';
+const CACHE_PREFIX = 'wx-plots';
+// Each deploy fills its own cache, so a worker still controlling open pages
+// never reads entries its successor has rewritten.
+const CACHE_NAME = `${CACHE_PREFIX}-${PRECACHE_VERSION}`;
+
+let manifestPromise = null;
+
+// Maps absolute URLs (without query strings) to their content hash.
+const readManifest = (response) =>
+  response.json().then((manifest) => {
+    const files = new Map();
+    Object.keys(manifest.files || {}).forEach((url) => {
+      files.set(new URL(url, self.registration.scope).href, manifest.files[url]);
+    });
+    const shared = (manifest.shared || []).map((url) => new URL(url, self.registration.scope).href);
+    return { version: manifest.version, files, shared };
+  });
+
+const loadManifest = (fromNetwork) => {
+  if (!manifestPromise || fromNetwork) {
+    const manifestUrl = new URL(MANIFEST_URL, self.registration.scope).href;
+    manifestPromise = caches.open(CACHE_NAME).then((cache) => {
+      const network = () =>
+        fetch(manifestUrl, { cache: 'no-cache' }).then((response) => {
+          if (!response.ok) {
+            throw new Error(`Precache manifest unavailable: ${response.status}`);
+          }
+          return cache.put(manifestUrl, response.clone()).then(() => readManifest(response));
+        });
+      if (fromNetwork) {
+        return network();
+      }
+      return cache.match(manifestUrl).then((cached) => (cached ? readManifest(cached) : network()));
+    });
+    manifestPromise.catch(() => {
+      manifestPromise = null;
+    });
+  }
+  return manifestPromise;
+};
+
+const cacheKey = (url, hash) => `${url}?v=${hash}`;
+
+const stripQuery = (href) => {
+  const url = new URL(href);
+  return `${url.origin}${url.pathname}`;
+};
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    loadManifest(true)
+      .then((manifest) =>
+        caches.open(CACHE_NAME).then((cache) =>
+          Promise.all(
+            manifest.shared.map((url) => {
+              const key = cacheKey(url, manifest.files.get(url));
+              // Unchanged files are copied over from the previous deploy's cache.
+              return caches.match(key).then((hit) =>
+                hit
+                  ? cache.put(key, hit)
+                  : fetch(url).then((response) => {
+                      if (!response.ok) {
+                        throw new Error(`Failed to precache ${url}: ${response.status}`);
+                      }
+                      return cache.put(key, response);
+                    })
+              );
+            })
+          )
+        )
+      )
+      .then(() => self.skipWaiting())
+  );
+});
+
+// Drops earlier deploys' caches and every cached response whose hash is no
+// longer in the manifest.
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter((name) => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+            .map((name) => caches.delete(name))
+        )
+      )
+      .then(() => Promise.all([loadManifest(false), caches.open(CACHE_NAME)]))
+      .then(([manifest, cache]) =>
+        cache.keys().then((requests) =>
+          Promise.all(
+            requests.map((request) => {
+              const url = new URL(request.url);
+              const base = `${url.origin}${url.pathname}`;
+              if (base === new URL(MANIFEST_URL, self.registration.scope).href) {
+                return null;
+              }
+              const hash = url.searchParams.get('v');
+              return manifest.files.get(base) === hash ? null : cache.delete(request);
+            })
+          )
+        )
+      )
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event;
+  if (request.method !== 'GET' || new URL(request.url).origin !== self.location.origin) {
+    return;
+  }
+  const url = stripQuery(request.url);
+  event.respondWith(
+    loadManifest(false)
+      .then((manifest) => {
+        const hash = manifest.files.get(url);
+        if (!hash) {
+          return fetch(request);
+        }
+        const key = cacheKey(url, hash);
+        return caches.open(CACHE_NAME).then((cache) =>
+          cache.match(key).then((hit) => {
+            if (hit) {
+              return hit;
+            }
+            return fetch(request).then((response) => {
+              if (response.ok && response.type === 'basic') {
+                cache.put(key, response.clone());
+              }
+              return response;
+            });
+          })
+        );
+      })
+      .catch(() => fetch(request))
+  );
+});
@@ -4,15 +4,31 @@
 from __future__ import annotations
 
 import argparse
-import subprocess
+import importlib
 import sys
+import time
+import traceback
+from dataclasses import replace
 from pathlib import Path
 from textwrap import dedent
+from typing import Iterable, Optional
+
+from build_db import BuildDatabase
+from build_interactive_from_spec import SharedAssets
+from storm_pipeline import (
+    PipelineOptions,
+    StormResult,
+    StormSources,
+    build_storms,
+    embed_stage,
+)
+from storm_watch import TreeWatcher
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data" / "storms"
 NOTEBOOKS_DIR = ROOT / "analysis" / "notebooks"
 SPECS_DIR = ROOT / "build" / "specs"
+BUILD_DB_PATH = ROOT / "build" / "build-db.json"
 PLOTS_DIR = ROOT / "assets" / "plots"
 STORMS_DIR = ROOT / "_storms"
 SCRIPTS_DIR = ROOT / "scripts"
@@ -155,90 +171,130 @@ def find_csv(slug: str) -> Path:
     return csvs[0]
 
 
-def run_parse(notebook: Path, spec: Path) -> None:
-    spec.parent.mkdir(parents=True, exist_ok=True)
-    result = subprocess.run(
-        [
-            sys.executable,
-            str(SCRIPTS_DIR / "parse_notebook_plots.py"),
-            str(notebook),
-        ],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-    spec.write_text(result.stdout, encoding="utf-8")
-
-
-def run_build(csv_path: Path, spec: Path, public_dir: Path) -> None:
-    public_dir.mkdir(parents=True, exist_ok=True)
-    subprocess.run(
-        [
-            sys.executable,
-            str(SCRIPTS_DIR / "build_interactive_from_spec.py"),
-            "--csv",
-            str(csv_path),
-            "--spec",
-            str(spec),
-            "--out",
-            str(public_dir),
-        ],
-        check=True,
-    )
-
-
-def run_build_static(csv_path: Path, spec: Path, public_dir: Path) -> None:
-    public_dir.mkdir(parents=True, exist_ok=True)
-    subprocess.run(
-        [
-            sys.executable,
-            str(SCRIPTS_DIR / "build_static_from_spec.py"),
-            "--csv",
-            str(csv_path),
-            "--spec",
-            str(spec),
-            "--out",
-            str(public_dir),
-        ],
-        check=True,
+def storm_sources(slug: str) -> StormSources:
+    storm_md = ensure_storm_container(slug)
+    return StormSources(
+        slug=slug,
+        notebook=find_notebook(slug),
+        csv_path=find_csv(slug),
+        spec_path=SPECS_DIR / f"{slug}.json",
+        public_dir=PLOTS_DIR / slug,
+        storm_md=storm_md,
     )
 
 
-def run_embed(spec: Path, storm_md: Path, public_dir: Path) -> None:
-    subprocess.run(
-        [
-            sys.executable,
-            str(SCRIPTS_DIR / "embed_plots_in_storm_page.py"),
-            "--spec",
-            str(spec),
-            "--storm-md",
-            str(storm_md),
-            "--public-dir",
-            str(public_dir.relative_to(ROOT)),
-        ],
-        check=True,
-    )
+def discover_slugs() -> list[str]:
+    if not DATA_DIR.exists():
+        return []
+    return sorted(p.name for p in DATA_DIR.iterdir() if p.is_dir())
 
 
-def process_storm(slug: str) -> None:
-    print(f"Processing {slug}...")
-    storm_md = ensure_storm_container(slug)
-    notebook = find_notebook(slug)
-    csv_path = find_csv(slug)
-    spec_path = SPECS_DIR / f"{slug}.json"
-    public_dir = PLOTS_DIR / slug
+def process_storms(
+    slugs: list[str],
+    *,
+    assets: SharedAssets,
+    options: PipelineOptions,
+    database: BuildDatabase,
+    jobs: int = 1,
+    force: bool = False,
+) -> int:
+    """Run the pipeline for ``slugs``; return the process exit code."""
+    exit_code = 0
+    storms: list[StormSources] = []
+    for slug in slugs:
+        try:
+            storms.append(storm_sources(slug))
+        except StormProcessingError as exc:
+            print(f"Skipping {slug}: {exc}", file=sys.stderr)
+            exit_code = 1
 
-    run_parse(notebook, spec_path)
-    run_build(csv_path, spec_path, public_dir)
-    run_build_static(csv_path, spec_path, public_dir)
-    run_embed(spec_path, storm_md, public_dir)
-    print(f"Completed {slug}.")
+    stages = {sources.slug: database.storm(sources.slug, force=force) for sources in storms}
+    built: list[tuple[StormSources, StormResult]] = []
+    results = build_storms(storms, assets=assets, options=options, stages=stages, jobs=jobs)
+    for sources, result in zip(storms, results):
+        sys.stdout.write(result.log)
+        sys.stdout.flush()
+        if result.error is not None:
+            print(f"Error processing {sources.slug}: {result.error}", file=sys.stderr)
+            exit_code = 1
+        else:
+            built.append((sources, result))
+
+    # Storm pages preload whatever the service worker lists as shared, so the
+    # pages are written once the whole run is recorded. Shared scripts are
+    # recorded even when every storm was up to date.
+    assets.record([sources.public_dir for sources, result in built if result.rebuilt])
+    for sources, result in built:
+        try:
+            embed_stage(result, sources, options=options, root=ROOT)
+        except Exception as exc:  # one broken page must not stop the others
+            traceback.print_exc()
+            print(f"Error processing {sources.slug}: {exc}", file=sys.stderr)
+            exit_code = 1
+            continue
+        database.update(sources.slug, result.stages)
+        note = "" if result.rebuilt else " (charts up to date)"
+        print(f"Completed {sources.slug}{note}.")
+    database.save()
+    return exit_code
 
 
-def discover_slugs() -> list[str]:
-    if not DATA_DIR.exists():
-        return []
-    return sorted(p.name for p in DATA_DIR.iterdir() if p.is_dir())
+def changed_slugs(paths: Iterable[Path]) -> dict[str, list[Path]]:
+    """Group changed data, notebook and storm page files by storm."""
+    changes: dict[str, list[Path]] = {}
+    for path in sorted(paths):
+        if DATA_DIR in path.parents:
+            slug = path.relative_to(DATA_DIR).parts[0]
+        elif NOTEBOOKS_DIR in path.parents:
+            slug = path.relative_to(NOTEBOOKS_DIR).parts[0]
+        elif path.parent == STORMS_DIR and path.suffix == ".md":
+            slug = path.stem
+        else:
+            continue
+        changes.setdefault(slug, []).append(path)
+    return changes
+
+
+def watch_storms(
+    slugs: Optional[set[str]],
+    *,
+    assets: SharedAssets,
+    options: PipelineOptions,
+    database: BuildDatabase,
+    jobs: int = 1,
+) -> None:
+    """Rebuild storms as their sources change, until interrupted.
+
+    ``slugs`` limits the storms watched; None follows every storm. Each
+    rebuild skips unchanged stages through the build database, as a normal
+    run does, and embeds the charts before redrawing static figures.
+    """
+    # Load matplotlib now so the first redraw does not pay for the import.
+    importlib.import_module("build_static_from_spec")
+    watcher = TreeWatcher((DATA_DIR, NOTEBOOKS_DIR, STORMS_DIR))
+    print("Watching for changes (Ctrl+C to stop)...")
+    while True:
+        changes = changed_slugs(watcher.wait())
+        targets = sorted(slug for slug in changes if slugs is None or slug in slugs)
+        if not targets:
+            continue
+        for slug in targets:
+            print(f"{slug}: {', '.join(path.name for path in changes[slug])} changed")
+        started = time.monotonic()
+        # Static figures take most of a rebuild; embed the charts first and
+        # redraw them in a second pass that finds every other stage fresh.
+        for pass_options, done in (
+            (replace(options, static=False), "Charts rebuilt"),
+            (options, "Static figures redrawn"),
+        ):
+            process_storms(
+                targets, assets=assets, options=pass_options, database=database, jobs=jobs
+            )
+            # Only the storm pages the run rewrote are taken as handled (specs
+            # live outside the watched tree); anything else saved meanwhile is
+            # reported by the next wait.
+            watcher.accept(STORMS_DIR / f"{slug}.md" for slug in targets)
+            print(f"{done} in {time.monotonic() - started:.2f}s")
 
 
 def main() -> int:
@@ -254,10 +310,63 @@ def main() -> int:
         action="store_true",
         help="Process all storms that have data and notebooks available.",
     )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Embed the charts so hover and zoom stay in step across a storm page.",
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Build one dashboard page per storm and embed it instead of per-chart iframes.",
+    )
+    parser.add_argument(
+        "--derive",
+        action="store_true",
+        help="Let the chart runtime compute pressure tendencies and rain totals from base columns.",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Have charts poll a delta file and append new observations during active storms.",
+    )
+    parser.add_argument(
+        "--pyramid",
+        action="store_true",
+        help="Ship pre-aggregated detail levels for long records and load finer data on zoom.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rerun every stage even when the build database says it is up to date.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the first run, keep rebuilding storms whose data, notebook or page changes.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Build up to N storms at once in separate processes (default: 1).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Draw up to N static figures of a storm at once (default: 1).",
+    )
     args = parser.parse_args()
 
     if args.slugs and args.all:
         parser.error("--slug and --all cannot be used together")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
     if args.slugs:
         slugs = args.slugs
@@ -268,16 +377,37 @@ def main() -> int:
         print("No storms found to process.")
         return 0
 
-    exit_code = 0
-    for slug in slugs:
-        try:
-            process_storm(slug)
-        except StormProcessingError as exc:
-            print(f"Skipping {slug}: {exc}", file=sys.stderr)
-            exit_code = 1
-        except subprocess.CalledProcessError as exc:
-            print(f"Error processing {slug}: {exc}", file=sys.stderr)
-            exit_code = 1
+    options = PipelineOptions(
+        sync=args.sync,
+        dashboard=args.dashboard,
+        derive=args.derive,
+        live=args.live,
+        pyramid=args.pyramid,
+        workers=args.workers,
+    )
+    # One set of shared scripts serves every storm in the run.
+    assets = SharedAssets()
+    database = BuildDatabase.load(BUILD_DB_PATH, ROOT, SCRIPTS_DIR)
+    exit_code = process_storms(
+        slugs,
+        assets=assets,
+        options=options,
+        database=database,
+        jobs=args.jobs,
+        force=args.force,
+    )
+    if not args.watch:
+        return exit_code
+    try:
+        watch_storms(
+            set(args.slugs) if args.slugs else None,
+            assets=assets,
+            options=options,
+            database=database,
+            jobs=args.jobs,
+        )
+    except KeyboardInterrupt:
+        pass
     return exit_code
 
 
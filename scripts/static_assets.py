@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Publish content-hashed shared assets used by the generated charts."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only .gz siblings are written.
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = ROOT / "scripts"
+ASSETS_DIR = ROOT / "assets"
+
+RUNTIME_SOURCE = SCRIPTS_DIR / "chart_runtime.js"
+RUNTIME_STEM = "chart-runtime"
+HASH_LENGTH = 10
+
+PLOTLY_VERSION = "2.31.1"
+PLOTLY_CDN = f"https://cdn.plot.ly/plotly-{PLOTLY_VERSION}.min.js"
+PLOTLY_VENDOR_DIR = "js/vendor"
+# Plotly's published partial bundles, smallest first, with the trace types each
+# one registers. Every bundle ships the cartesian axes, legends, annotations and
+# range slider the specs rely on.
+PLOTLY_PARTIAL_BUNDLES = (
+    ("basic", frozenset({"scatter", "bar", "pie"})),
+    (
+        "cartesian",
+        frozenset(
+            {
+                "scatter",
+                "bar",
+                "box",
+                "contour",
+                "heatmap",
+                "histogram",
+                "histogram2d",
+                "histogram2dcontour",
+                "image",
+                "pie",
+                "violin",
+            }
+        ),
+    ),
+    (
+        "gl2d",
+        frozenset(
+            {"scatter", "scattergl", "splom", "pointcloud", "heatmapgl", "contourgl", "parcoords"}
+        ),
+    ),
+)
+DOWNLOAD_TIMEOUT = 30
+
+BUILD_MANIFEST_NAME = "build-manifest.json"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+# Mid-range levels: brotli 11 is ~70x slower than 6 for ~15% smaller output,
+# which does not pay off across a pyramid's worth of small files.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+# Below this size the compressed copy saves less than the extra request costs.
+MIN_COMPRESS_BYTES = 1024
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def minify_js(source: str) -> str:
+    """Strip comments, indentation and blank lines without touching statements.
+
+    Lines are kept separate so automatic semicolon insertion behaves exactly as
+    it does in the readable source.
+    """
+    lines = []
+    in_comment = False
+    for raw in source.splitlines():
+        line = raw.strip()
+        if in_comment:
+            if "*/" not in line:
+                continue
+            in_comment = False
+            line = line.split("*/", 1)[1].strip()
+        if line.startswith("/*"):
+            if "*/" not in line:
+                in_comment = True
+                continue
+            line = line.split("*/", 1)[1].strip()
+        if not line or line.startswith("//"):
+            continue
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def publish_asset(content: Union[str, bytes], directory: Path, stem: str, suffix: str) -> Path:
+    """Write ``content`` as ``<stem>.<hash><suffix>`` and drop older hashed copies."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    path = directory / f"{stem}.{content_hash(data)}{suffix}"
+    directory.mkdir(parents=True, exist_ok=True)
+    pattern = re.compile(
+        rf"{re.escape(stem)}\.[0-9a-f]{{{HASH_LENGTH}}}{re.escape(suffix)}"
+    )
+    for stale in directory.glob(f"{stem}.*{suffix}"):
+        if stale != path and pattern.fullmatch(stale.name):
+            stale.unlink()
+            for sibling in compressed_siblings(stale):
+                sibling.unlink(missing_ok=True)
+    if not path.exists() or path.read_bytes() != data:
+        path.write_bytes(data)
+    return path
+
+
+def write_if_changed(path: Path, text: str) -> Path:
+    """Write ``text`` unless ``path`` already holds it.
+
+    Unchanged files keep their mtime, and their precompressed copies stay valid.
+    """
+    if not path.exists() or path.read_text(encoding="utf-8") != text:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return path
+
+
+def publish_runtime(assets_dir: Path = ASSETS_DIR) -> Path:
+    source = RUNTIME_SOURCE.read_text(encoding="utf-8")
+    return publish_asset(minify_js(source), assets_dir / "js", RUNTIME_STEM, ".min.js")
+
+
+def select_plotly_bundle(trace_types: Iterable[str]) -> Optional[str]:
+    needed = set(trace_types) or {"scatter"}
+    for name, provided in PLOTLY_PARTIAL_BUNDLES:
+        if needed <= provided:
+            return name
+    return None
+
+
+def vendor_plotly(trace_types: Iterable[str], assets_dir: Path = ASSETS_DIR) -> Optional[Path]:
+    """Return a vendored partial Plotly bundle covering ``trace_types``.
+
+    A bundle that has already been vendored is reused as-is, so builds stay
+    offline and reproducible. ``None`` means the caller should fall back to the
+    full CDN build.
+    """
+    bundle = select_plotly_bundle(trace_types)
+    if bundle is None:
+        return None
+    stem = f"plotly-{bundle}-{PLOTLY_VERSION}"
+    vendor_dir = assets_dir / PLOTLY_VENDOR_DIR
+    pattern = re.compile(rf"{re.escape(stem)}\.([0-9a-f]{{{HASH_LENGTH}}})\.min\.js")
+    for existing in sorted(vendor_dir.glob(f"{stem}.*.min.js")):
+        match = pattern.fullmatch(existing.name)
+        if match and content_hash(existing.read_bytes()) == match.group(1):
+            return existing
+    url = f"https://cdn.plot.ly/{stem}.min.js"
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            data = response.read()
+    except (urllib.error.URLError, OSError) as exc:
+        print(f"Could not vendor {url} ({exc}); using the full CDN bundle", file=sys.stderr)
+        return None
+    return publish_asset(data, vendor_dir, stem, ".min.js")
+
+
+def compressed_siblings(path: Path) -> list:
+    return [path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES]
+
+
+def precompress(path: Path, data: bytes, *, fresh: bool) -> Dict[str, int]:
+    """Write .gz (and .br when brotli is installed) next to ``path``.
+
+    Existing siblings are kept when ``fresh`` says the content is unchanged.
+    """
+    gz_path, br_path = compressed_siblings(path)
+    if len(data) < MIN_COMPRESS_BYTES:
+        gz_path.unlink(missing_ok=True)
+        br_path.unlink(missing_ok=True)
+        return {}
+    sizes: Dict[str, int] = {}
+    if not (fresh and gz_path.exists()):
+        gz_path.write_bytes(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    sizes["gzip"] = gz_path.stat().st_size
+    if brotli is not None:
+        if not (fresh and br_path.exists()):
+            br_path.write_bytes(brotli.compress(data, quality=BROTLI_QUALITY))
+        sizes["br"] = br_path.stat().st_size
+    return sizes
+
+
+def record_artifacts(manifest_dir: Path, paths: Iterable[Path]) -> Path:
+    """Precompress ``paths`` and merge their sizes and hashes into the manifest."""
+    manifest_path = manifest_dir / BUILD_MANIFEST_NAME
+    artifacts: Dict[str, Dict[str, object]] = {}
+    if manifest_path.exists():
+        artifacts = json.loads(manifest_path.read_text(encoding="utf-8")).get("artifacts", {})
+    for path in paths:
+        key = path.resolve().relative_to(manifest_dir.resolve()).as_posix()
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        previous = artifacts.get(key) or {}
+        entry: Dict[str, object] = {"bytes": len(data), "sha256": digest}
+        entry.update(precompress(path, data, fresh=previous.get("sha256") == digest))
+        artifacts[key] = entry
+    artifacts = {
+        key: artifacts[key] for key in sorted(artifacts) if (manifest_dir / key).exists()
+    }
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps({"version": 1, "artifacts": artifacts}, indent=2) + "\n", encoding="utf-8"
+    )
+    return manifest_path
+
+
+def relative_url(target: Path, from_dir: Path) -> str:
+    return os.path.relpath(target.resolve(), from_dir.resolve()).replace(os.sep, "/")
+
+
+__all__ = [
+    "ASSETS_DIR",
+    "BUILD_MANIFEST_NAME",
+    "HASH_LENGTH",
+    "PLOTLY_CDN",
+    "SCRIPTS_DIR",
+    "content_hash",
+    "minify_js",
+    "publish_asset",
+    "publish_runtime",
+    "record_artifacts",
+    "relative_url",
+    "select_plotly_bundle",
+    "vendor_plotly",
+    "write_if_changed",
+]
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Run a storm's plot stages in one process over inputs loaded once."""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from build_db import StageLog
+from build_interactive_from_spec import SharedAssets, build_charts
+from embed_plots_in_storm_page import embed_storm
+from parse_notebook_plots import parse_notebook
+from plot_service_worker import PRECACHE_MANIFEST_NAME
+from plot_spec_utils import FigureSpec, StormData, figure_columns, load_data, parse_figure
+from static_assets import record_artifacts
+
+
+@dataclass
+class StormSources:
+    """Where one storm's inputs live and where its outputs go."""
+
+    slug: str
+    notebook: Path
+    csv_path: Path
+    spec_path: Path
+    public_dir: Path
+    storm_md: Path
+
+
+@dataclass
+class PipelineOptions:
+    sync: bool = False
+    dashboard: bool = False
+    derive: bool = False
+    live: bool = False
+    pyramid: bool = False
+    workers: int = 1
+    # Off for watch mode's first pass, which embeds the charts before the
+    # slower static figures are redrawn.
+    static: bool = True
+
+
+def parse_stage(sources: StormSources, stages: StageLog) -> List[Dict[str, object]]:
+    inputs = stages.inputs(sources.notebook)
+    if stages.fresh("parse", inputs):
+        return json.loads(sources.spec_path.read_text(encoding="utf-8"))
+    entries = parse_notebook(str(sources.notebook))
+    # The spec file is no longer read back by a full pipeline run; it stays on
+    # disk for running a single stage's CLI and for inspecting a build.
+    sources.spec_path.parent.mkdir(parents=True, exist_ok=True)
+    sources.spec_path.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    stages.record("parse", inputs, [sources.spec_path])
+    return entries
+
+
+@dataclass
+class StormResult:
+    """What a storm's build left behind, including everything it printed."""
+
+    slug: str
+    stages: Optional[StageLog] = None
+    log: str = ""
+    error: Optional[str] = None
+    rebuilt: bool = False
+    entries: List[Dict[str, object]] = field(default_factory=list)
+    written: List[Path] = field(default_factory=list)
+    bundles: Dict[FrozenSet[str], Optional[Path]] = field(default_factory=dict)
+
+
+def build_storm(
+    sources: StormSources,
+    *,
+    assets: SharedAssets,
+    options: PipelineOptions,
+    stages: StageLog,
+) -> StormResult:
+    """Parse one storm and write its charts and static images.
+
+    Stages whose inputs match ``stages`` and whose outputs are intact are
+    skipped. Without ``options.static`` the static images stay as they are
+    and keep their last record.
+    """
+    entries = parse_stage(sources, stages)
+    chart_inputs = stages.inputs(
+        sources.csv_path,
+        sources.spec_path,
+        dashboard=options.dashboard,
+        derive=options.derive,
+        live=options.live,
+        pyramid=options.pyramid,
+    )
+    static_inputs = stages.inputs(sources.csv_path, sources.spec_path)
+    charts_fresh = stages.fresh("charts", chart_inputs)
+    if options.static:
+        static_fresh = stages.fresh("static", static_inputs)
+    else:
+        stages.keep("static")
+        static_fresh = True
+    result = StormResult(sources.slug, stages=stages, entries=entries)
+    if not (charts_fresh and static_fresh):
+        figures = [parse_figure(entry) for entry in entries]
+        data = load_data(sources.csv_path)
+        result.rebuilt = True
+    if not charts_fresh:
+        # Charts share pyramids, base columns and the dashboard, and all of
+        # them build in a fraction of the time one static figure takes to
+        # draw; pages whose bytes come out unchanged are left untouched.
+        charts = build_charts(
+            figures,
+            data,
+            sources.public_dir,
+            assets=assets,
+            pyramid=options.pyramid,
+            dashboard=options.dashboard,
+            derive=options.derive,
+            live=options.live,
+        )
+        stages.record("charts", chart_inputs, charts)
+    if not static_fresh:
+        static, parts = draw_changed_static(entries, figures, data, sources, options, stages)
+        stages.record("static", static_inputs, static, parts=parts)
+    result.written = [
+        stages.root / key
+        for stage in ("charts", "static")
+        if stage in stages.current
+        for key in stages.outputs(stage)
+    ]
+    return result
+
+
+def column_digest(values: List[Optional[float]]) -> str:
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+
+
+def static_digests(
+    entries: List[Dict[str, object]], figures: List[FigureSpec], data: StormData, generator: str
+) -> List[str]:
+    """Hash each figure's spec entry with the CSV columns it plots."""
+    columns: Dict[str, str] = {}
+
+    def digest_of(name: str) -> str:
+        if name not in columns:
+            values = data.columns.get(name)
+            columns[name] = "missing" if values is None else column_digest(values)
+        return columns[name]
+
+    times = column_digest(data.times)
+    digests: List[str] = []
+    for entry, spec in zip(entries, figures):
+        parts = {
+            "entry": entry,
+            "times": times,
+            "columns": {name: digest_of(name) for name in figure_columns(spec)},
+            "generator": generator,
+        }
+        text = json.dumps(parts, sort_keys=True)
+        digests.append(hashlib.sha256(text.encode("utf-8")).hexdigest())
+    return digests
+
+
+def draw_changed_static(
+    entries: List[Dict[str, object]],
+    figures: List[FigureSpec],
+    data: StormData,
+    sources: StormSources,
+    options: PipelineOptions,
+    stages: StageLog,
+) -> Tuple[List[Path], Dict[str, str]]:
+    """Redraw only the static figures whose spec entry or columns changed.
+
+    Returns every figure's image and the digest-to-image map to record.
+    """
+    digests = static_digests(entries, figures, data, stages.generator)
+    keys: Dict[str, Optional[str]] = {
+        digest: stages.reusable_part("static", digest) for digest in digests
+    }
+    dirty = [index for index, digest in enumerate(digests) if keys[digest] is None]
+    if dirty:
+        print(f"Drawing {len(dirty)} of {len(figures)} static figures")
+        # matplotlib takes most of a second to import; runs that redraw
+        # nothing skip it.
+        from build_static_from_spec import draw_static
+
+        drawn = draw_static(
+            [figures[index] for index in dirty],
+            data,
+            sources.public_dir,
+            workers=options.workers,
+        )
+        for index, path in zip(dirty, drawn):
+            keys[digests[index]] = stages.key(path) if path is not None else ""
+        record_artifacts(sources.public_dir, [path for path in drawn if path is not None])
+    static = [stages.root / key for key in dict.fromkeys(keys.values()) if key]
+    return static, {digest: key for digest, key in keys.items() if key is not None}
+
+
+def embed_stage(
+    result: StormResult, sources: StormSources, *, options: PipelineOptions, root: Path
+) -> None:
+    """Write a built storm into its page; ``root`` is the site root."""
+    stages = result.stages
+    inputs = stages.inputs(
+        sources.spec_path,
+        sources.public_dir.parent / PRECACHE_MANIFEST_NAME,
+        sync=options.sync,
+        dashboard=options.dashboard,
+        plots=stages.digest("charts"),
+        static=stages.digest("static"),
+    )
+    if stages.fresh("embed", inputs):
+        return
+    embed_storm(
+        result.entries,
+        sources.storm_md,
+        sources.public_dir.relative_to(root),
+        sync=options.sync,
+        dashboard=options.dashboard,
+        root=root,
+    )
+    stages.record("embed", inputs, [sources.storm_md])
+
+
+def build_captured(
+    sources: StormSources, assets: SharedAssets, options: PipelineOptions, stages: StageLog
+) -> StormResult:
+    """Build one storm with its output buffered, so parallel logs never mix."""
+    log = io.StringIO()
+    with redirect_stdout(log), redirect_stderr(log):
+        print(f"Processing {sources.slug}...")
+        try:
+            result = build_storm(sources, assets=assets, options=options, stages=stages)
+        except Exception as exc:
+            traceback.print_exc()
+            return StormResult(sources.slug, log=log.getvalue(), error=str(exc))
+    result.log = log.getvalue()
+    result.bundles = dict(assets.bundles)
+    return result
+
+
+def build_storms(
+    storms: List[StormSources],
+    *,
+    assets: SharedAssets,
+    options: PipelineOptions,
+    stages: Dict[str, StageLog],
+    jobs: int = 1,
+) -> Iterator[StormResult]:
+    """Build ``storms`` on up to ``jobs`` processes; yield results in order.
+
+    ``stages`` holds each storm's build-database records by slug. The largest
+    records start first so one long storm does not trail the rest of the run.
+    Shared scripts are published and Plotly bundles vendored here before any
+    stage is checked or worker started; callers record them once every storm
+    is built.
+    """
+    assets.prepare()
+    if jobs <= 1 or len(storms) <= 1:
+        for sources in storms:
+            yield build_captured(sources, assets, options, stages[sources.slug])
+        return
+    largest_first = sorted(
+        storms, key=lambda sources: sources.csv_path.stat().st_size, reverse=True
+    )
+    with ProcessPoolExecutor(max_workers=min(jobs, len(storms))) as pool:
+        futures = {
+            sources.slug: pool.submit(
+                build_captured, sources, assets, options, stages[sources.slug]
+            )
+            for sources in largest_first
+        }
+        for sources in storms:
+            try:
+                result = futures[sources.slug].result()
+            except Exception as exc:  # the worker process itself died
+                result = StormResult(sources.slug, error=f"worker failed: {exc}")
+            assets.bundles.update(result.bundles)
+            yield result
+
+
+__all__ = [
+    "PipelineOptions",
+    "StormResult",
+    "StormSources",
+    "build_storm",
+    "build_storms",
+    "embed_stage",
+    "parse_stage",
+]
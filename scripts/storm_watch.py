@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Poll source directories and report settled bursts of file changes."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+POLL_INTERVAL = 0.1
+# Editors and notebook servers save in bursts (temp file, rename, checkpoint);
+# report only after a quiet spell this long.
+DEBOUNCE = 0.2
+IGNORED_DIRS = {".ipynb_checkpoints", "__pycache__"}
+
+FileState = Tuple[int, int]
+
+
+def ignored(path: Path) -> bool:
+    name = path.name
+    if name.startswith((".", "~")) or name.endswith(("~", ".swp", ".tmp")):
+        return True
+    return any(part in IGNORED_DIRS for part in path.parts)
+
+
+def file_state(path: Path) -> Optional[FileState]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:  # removed between listing and stat
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def snapshot(directories: Iterable[Path]) -> Dict[Path, FileState]:
+    files: Dict[Path, FileState] = {}
+    for directory in directories:
+        if not directory.exists():
+            continue
+        for path in directory.rglob("*"):
+            if ignored(path) or not path.is_file():
+                continue
+            state = file_state(path)
+            if state is not None:
+                files[path] = state
+    return files
+
+
+def changed_paths(before: Dict[Path, FileState], after: Dict[Path, FileState]) -> Set[Path]:
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+@dataclass
+class TreeWatcher:
+    """Polls ``directories``; ``wait`` returns once a burst of changes settles."""
+
+    directories: Tuple[Path, ...]
+    interval: float = POLL_INTERVAL
+    debounce: float = DEBOUNCE
+    state: Dict[Path, FileState] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.rebase()
+
+    def rebase(self) -> None:
+        """Accept the whole tree as it is now."""
+        self.state = snapshot(self.directories)
+
+    def accept(self, paths: Iterable[Path]) -> None:
+        """Accept ``paths`` as they are now, e.g. files the pipeline wrote.
+
+        Every other change since the last poll is still reported by ``wait``.
+        """
+        for path in paths:
+            watched = any(directory in path.parents for directory in self.directories)
+            if not watched or ignored(path):
+                continue
+            state = file_state(path)
+            if state is None:
+                self.state.pop(path, None)
+            else:
+                self.state[path] = state
+
+    def wait(self) -> Set[Path]:
+        pending: Set[Path] = set()
+        last_change = 0.0
+        while True:
+            time.sleep(self.interval)
+            current = snapshot(self.directories)
+            changed = changed_paths(self.state, current)
+            self.state = current
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+            elif pending and time.monotonic() - last_change >= self.debounce:
+                return pending
+
+
+__all__ = [
+    "TreeWatcher",
+    "changed_paths",
+    "file_state",
+    "snapshot",
+]